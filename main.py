@@ -1,4 +1,5 @@
-import asyncio
+from contextlib import asynccontextmanager
+
 import uvicorn
 from fastapi import FastAPI
 from fastapi.exceptions import RequestValidationError
@@ -6,10 +7,31 @@ from fastapi.staticfiles import StaticFiles
 from starlette.exceptions import HTTPException as StarletteHTTPException
 from routes import auth_router, frontend_router, user_account_router, admin_panel_router, bot_code_router
 from routes.errors import http_exception_handler, validation_exception_handler, general_exception_handler
-from tg_bot import start
+from settings import api_config, async_engine, warm_pool
+from tools.events import repair_events
+from tools.file_upload import ContentLengthLimit
+from tools.passwords import shutdown_executor
+from tools.ratelimit import RateLimitMiddleware, repair_add_limit
+from tools.templates import precompile_templates
 import threading
 
-app = FastAPI(title="RepairHub API", version="1.0.0")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Telegram-бот працює окремим процесом (python -m tg_bot) і забирає
+    # сповіщення з outbox, тож API можна запускати в кількох воркерах.
+    # Воркер приймає трафік лише після прогріву шаблонів та пулу БД
+    precompile_templates()
+    await warm_pool(async_engine, api_config.DB_POOL_WARM)
+    await repair_events.start()
+    yield
+    # Запити вже завершені: дочекатися хешувань і закрити з'єднання
+    await repair_events.stop()
+    shutdown_executor()
+    await async_engine.dispose()
+
+
+app = FastAPI(title="RepairHub API", version="1.0.0", lifespan=lifespan)
 
 # Mount static files
 app.mount("/static", StaticFiles(directory="static"), name="static")
@@ -21,14 +43,18 @@ app.include_router(user_account_router, prefix="/account", tags=["account"])
 app.include_router(admin_panel_router, prefix="/admin", tags=["admin"])
 app.include_router(bot_code_router, prefix="/admin", tags=["admin"])
 
+# Ліміти, які мають спрацювати до читання тіла запиту
+app.add_middleware(
+    RateLimitMiddleware,
+    limits={("POST", "/account/repair/add"): (ContentLengthLimit(), repair_add_limit)},
+    handler=http_exception_handler,
+)
+
 # Error handlers
 app.add_exception_handler(StarletteHTTPException, http_exception_handler)
 app.add_exception_handler(RequestValidationError, validation_exception_handler)
 app.add_exception_handler(Exception, general_exception_handler)
 
-@app.on_event("startup")
-async def on_startup():
-    asyncio.create_task(start())
-
+# Розробка з автоперезавантаженням; продакшн - python serve.py
 if __name__ == "__main__":
     uvicorn.run("main:app", port=8001, reload=True, host="localhost")
\ No newline at end of file
@@ -0,0 +1,212 @@
+"""report triggers per statement
+
+Revision ID: 7e4b9d2c6a15
+Revises: c5e8a1f4b729
+Create Date: 2026-10-18 19:40:18.305927
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "7e4b9d2c6a15"
+down_revision: Union[str, Sequence[str], None] = "c5e8a1f4b729"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Тригер на рядок оновлював спільні рядки лічильників у довільному порядку,
+# і дві одночасні масові зміни статусу могли взаємно заблокуватись. Тепер
+# тригер на інструкцію агрегує зміни з таблиць переходів і оновлює лічильники
+# в порядку ключа. Час виконання - updated_at - created_at (обидва в UTC)
+# замість localtimestamp, який залежав від поясу сервера
+REPORT_FUNCTIONS = [
+    """
+CREATE OR REPLACE FUNCTION report_repair_insert() RETURNS trigger AS $$
+BEGIN
+    INSERT INTO report_status_counts (status, count)
+    SELECT status, sum(delta) FROM (SELECT status, admin_id, 1 AS delta FROM new_rows) AS d
+    GROUP BY status HAVING sum(delta) <> 0 ORDER BY status
+    ON CONFLICT (status) DO UPDATE
+    SET count = report_status_counts.count + EXCLUDED.count;
+
+    INSERT INTO report_admin_workload (admin_id, open_count)
+    SELECT admin_id, sum(delta) FROM (SELECT status, admin_id, 1 AS delta FROM new_rows) AS d
+    WHERE admin_id IS NOT NULL AND status IN ('NEW', 'IN_PROGRESS', 'MESSAGE')
+    GROUP BY admin_id HAVING sum(delta) <> 0 ORDER BY admin_id
+    ON CONFLICT (admin_id) DO UPDATE
+    SET open_count = report_admin_workload.open_count + EXCLUDED.open_count;
+
+    INSERT INTO report_daily_intake (day, count)
+    SELECT CAST(created_at AS date), count(*) FROM new_rows
+    GROUP BY 1 ORDER BY 1
+    ON CONFLICT (day) DO UPDATE SET count = report_daily_intake.count + EXCLUDED.count;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql
+""",
+    """
+CREATE OR REPLACE FUNCTION report_repair_delete() RETURNS trigger AS $$
+BEGIN
+    INSERT INTO report_status_counts (status, count)
+    SELECT status, sum(delta) FROM (SELECT status, admin_id, -1 AS delta FROM old_rows) AS d
+    GROUP BY status HAVING sum(delta) <> 0 ORDER BY status
+    ON CONFLICT (status) DO UPDATE
+    SET count = report_status_counts.count + EXCLUDED.count;
+
+    INSERT INTO report_admin_workload (admin_id, open_count)
+    SELECT admin_id, sum(delta) FROM (SELECT status, admin_id, -1 AS delta FROM old_rows) AS d
+    WHERE admin_id IS NOT NULL AND status IN ('NEW', 'IN_PROGRESS', 'MESSAGE')
+    GROUP BY admin_id HAVING sum(delta) <> 0 ORDER BY admin_id
+    ON CONFLICT (admin_id) DO UPDATE
+    SET open_count = report_admin_workload.open_count + EXCLUDED.open_count;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql
+""",
+    """
+CREATE OR REPLACE FUNCTION report_repair_update() RETURNS trigger AS $$
+BEGIN
+    INSERT INTO report_status_counts (status, count)
+    SELECT status, sum(delta) FROM (
+    SELECT n.status, n.admin_id, 1 AS delta
+    FROM new_rows n JOIN old_rows o USING (id)
+    WHERE n.status <> o.status OR n.admin_id IS DISTINCT FROM o.admin_id
+    UNION ALL
+    SELECT o.status, o.admin_id, -1 AS delta
+    FROM new_rows n JOIN old_rows o USING (id)
+    WHERE n.status <> o.status OR n.admin_id IS DISTINCT FROM o.admin_id
+) AS d
+    GROUP BY status HAVING sum(delta) <> 0 ORDER BY status
+    ON CONFLICT (status) DO UPDATE
+    SET count = report_status_counts.count + EXCLUDED.count;
+
+    INSERT INTO report_admin_workload (admin_id, open_count)
+    SELECT admin_id, sum(delta) FROM (
+    SELECT n.status, n.admin_id, 1 AS delta
+    FROM new_rows n JOIN old_rows o USING (id)
+    WHERE n.status <> o.status OR n.admin_id IS DISTINCT FROM o.admin_id
+    UNION ALL
+    SELECT o.status, o.admin_id, -1 AS delta
+    FROM new_rows n JOIN old_rows o USING (id)
+    WHERE n.status <> o.status OR n.admin_id IS DISTINCT FROM o.admin_id
+) AS d
+    WHERE admin_id IS NOT NULL AND status IN ('NEW', 'IN_PROGRESS', 'MESSAGE')
+    GROUP BY admin_id HAVING sum(delta) <> 0 ORDER BY admin_id
+    ON CONFLICT (admin_id) DO UPDATE
+    SET open_count = report_admin_workload.open_count + EXCLUDED.open_count;
+
+    INSERT INTO report_completion_hours (hour, count, total_seconds)
+    SELECT floor(seconds / 3600), count(*), sum(seconds)
+    FROM (
+        SELECT greatest(extract(epoch FROM n.updated_at - n.created_at), 0) AS seconds
+        FROM new_rows n JOIN old_rows o USING (id)
+        WHERE n.status = 'COMPLETED' AND o.status <> 'COMPLETED'
+    ) AS completed
+    GROUP BY 1 ORDER BY 1
+    ON CONFLICT (hour) DO UPDATE
+    SET count = report_completion_hours.count + EXCLUDED.count,
+        total_seconds = report_completion_hours.total_seconds + EXCLUDED.total_seconds;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql
+""",
+]
+
+REPORT_TRIGGERS = [
+    """
+CREATE TRIGGER repair_requests_report_insert
+AFTER INSERT ON repair_requests REFERENCING NEW TABLE AS new_rows
+FOR EACH STATEMENT EXECUTE FUNCTION report_repair_insert()
+""",
+    """
+CREATE TRIGGER repair_requests_report_delete
+AFTER DELETE ON repair_requests REFERENCING OLD TABLE AS old_rows
+FOR EACH STATEMENT EXECUTE FUNCTION report_repair_delete()
+""",
+    """
+CREATE TRIGGER repair_requests_report_update
+AFTER UPDATE ON repair_requests REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+FOR EACH STATEMENT EXECUTE FUNCTION report_repair_update()
+""",
+]
+
+OPS = ("insert", "delete", "update")
+
+# Попередня версія (e58a2f1c9d07) з тим самим розрахунком часу
+ROW_FUNCTION = """
+CREATE OR REPLACE FUNCTION report_repair_change() RETURNS trigger AS $$
+DECLARE
+    seconds double precision;
+BEGIN
+    IF TG_OP = 'UPDATE' AND OLD.status = NEW.status
+            AND OLD.admin_id IS NOT DISTINCT FROM NEW.admin_id THEN
+        RETURN NULL;
+    END IF;
+
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        UPDATE report_status_counts SET count = count - 1
+        WHERE status = OLD.status;
+        IF OLD.admin_id IS NOT NULL AND OLD.status IN ('NEW', 'IN_PROGRESS', 'MESSAGE') THEN
+            UPDATE report_admin_workload SET open_count = open_count - 1
+            WHERE admin_id = OLD.admin_id;
+        END IF;
+    END IF;
+
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        INSERT INTO report_status_counts (status, count) VALUES (NEW.status, 1)
+        ON CONFLICT (status) DO UPDATE SET count = report_status_counts.count + 1;
+        IF NEW.admin_id IS NOT NULL AND NEW.status IN ('NEW', 'IN_PROGRESS', 'MESSAGE') THEN
+            INSERT INTO report_admin_workload (admin_id, open_count)
+            VALUES (NEW.admin_id, 1)
+            ON CONFLICT (admin_id) DO UPDATE
+            SET open_count = report_admin_workload.open_count + 1;
+        END IF;
+    END IF;
+
+    IF TG_OP = 'INSERT' THEN
+        INSERT INTO report_daily_intake (day, count)
+        VALUES (CAST(NEW.created_at AS date), 1)
+        ON CONFLICT (day) DO UPDATE SET count = report_daily_intake.count + 1;
+    END IF;
+
+    IF TG_OP = 'UPDATE' AND NEW.status = 'COMPLETED' AND OLD.status <> 'COMPLETED' THEN
+        seconds := greatest(extract(epoch FROM NEW.updated_at - NEW.created_at), 0);
+        INSERT INTO report_completion_hours (hour, count, total_seconds)
+        VALUES (floor(seconds / 3600), 1, seconds)
+        ON CONFLICT (hour) DO UPDATE
+        SET count = report_completion_hours.count + 1,
+            total_seconds = report_completion_hours.total_seconds + EXCLUDED.total_seconds;
+    END IF;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql
+"""
+
+ROW_TRIGGER = """
+CREATE TRIGGER repair_requests_report
+AFTER INSERT OR DELETE OR UPDATE OF status, admin_id ON repair_requests
+FOR EACH ROW EXECUTE FUNCTION report_repair_change()
+"""
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("DROP TRIGGER IF EXISTS repair_requests_report ON repair_requests")
+    op.execute("DROP FUNCTION IF EXISTS report_repair_change()")
+    for statement in REPORT_FUNCTIONS + REPORT_TRIGGERS:
+        op.execute(statement)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for name in OPS:
+        op.execute(f"DROP TRIGGER IF EXISTS repair_requests_report_{name} ON repair_requests")
+        op.execute(f"DROP FUNCTION IF EXISTS report_repair_{name}()")
+    op.execute(ROW_FUNCTION)
+    op.execute(ROW_TRIGGER)
@@ -0,0 +1,85 @@
+"""add indexes for hot lookups
+
+Revision ID: 9b1e4d7a2c31
+Revises: 66f38c7b9f5c, c2f72ef31a99
+Create Date: 2026-10-18 10:12:04.318207
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "9b1e4d7a2c31"
+down_revision: Union[str, Sequence[str], None] = ("66f38c7b9f5c", "c2f72ef31a99")
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Списки заявок: keyset по (created_at, id) з фільтром статусу/автора/майстра
+    op.create_index(
+        "ix_repair_requests_created_at_id",
+        "repair_requests",
+        ["created_at", "id"],
+        unique=False,
+    )
+    op.create_index(
+        "ix_repair_requests_status_created_at",
+        "repair_requests",
+        ["status", "created_at", "id"],
+        unique=False,
+    )
+    op.create_index(
+        "ix_repair_requests_user_id_created_at",
+        "repair_requests",
+        ["user_id", "created_at", "id"],
+        unique=False,
+    )
+    op.create_index(
+        "ix_repair_requests_admin_id_created_at",
+        "repair_requests",
+        ["admin_id", "created_at", "id"],
+        unique=False,
+    )
+    # Переписка по заявці
+    op.create_index(
+        "ix_admin_messages_request_id_created_at",
+        "admin_messages",
+        ["request_id", "created_at"],
+        unique=False,
+    )
+    # Логін та прив'язка Telegram
+    op.create_index(op.f("ix_users_username"), "users", ["username"], unique=False)
+    op.create_index(
+        op.f("ix_users_in_telegram_tg_code"),
+        "users_in_telegram",
+        ["tg_code"],
+        unique=False,
+    )
+    op.create_index(
+        op.f("ix_users_in_telegram_user_in_site"),
+        "users_in_telegram",
+        ["user_in_site"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(
+        op.f("ix_users_in_telegram_user_in_site"), table_name="users_in_telegram"
+    )
+    op.drop_index(op.f("ix_users_in_telegram_tg_code"), table_name="users_in_telegram")
+    op.drop_index(op.f("ix_users_username"), table_name="users")
+    op.drop_index(
+        "ix_admin_messages_request_id_created_at", table_name="admin_messages"
+    )
+    op.drop_index(
+        "ix_repair_requests_admin_id_created_at", table_name="repair_requests"
+    )
+    op.drop_index("ix_repair_requests_user_id_created_at", table_name="repair_requests")
+    op.drop_index("ix_repair_requests_status_created_at", table_name="repair_requests")
+    op.drop_index("ix_repair_requests_created_at_id", table_name="repair_requests")
@@ -0,0 +1,32 @@
+"""add users_in_telegram chat index
+
+Revision ID: a8c3f5e71d26
+Revises: f13b6d8e2a94
+Create Date: 2026-10-18 18:20:11.204518
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "a8c3f5e71d26"
+down_revision: Union[str, Sequence[str], None] = "f13b6d8e2a94"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        op.f("ix_users_in_telegram_user_tg_id"),
+        "users_in_telegram",
+        ["user_tg_id"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f("ix_users_in_telegram_user_tg_id"), table_name="users_in_telegram")
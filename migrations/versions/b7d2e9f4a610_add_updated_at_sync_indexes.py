@@ -0,0 +1,39 @@
+"""add updated_at sync indexes
+
+Revision ID: b7d2e9f4a610
+Revises: 3f6a8c0d5e12
+Create Date: 2026-10-18 14:05:37.551870
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "b7d2e9f4a610"
+down_revision: Union[str, Sequence[str], None] = "3f6a8c0d5e12"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        "ix_repair_requests_updated_at_id",
+        "repair_requests",
+        ["updated_at", "id"],
+        unique=False,
+    )
+    op.create_index(
+        "ix_repair_requests_user_id_updated_at",
+        "repair_requests",
+        ["user_id", "updated_at", "id"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_repair_requests_user_id_updated_at", table_name="repair_requests")
+    op.drop_index("ix_repair_requests_updated_at_id", table_name="repair_requests")
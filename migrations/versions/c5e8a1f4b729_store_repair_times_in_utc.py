@@ -0,0 +1,57 @@
+"""store repair times in utc
+
+Revision ID: c5e8a1f4b729
+Revises: a8c3f5e71d26
+Create Date: 2026-10-18 19:05:42.671203
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "c5e8a1f4b729"
+down_revision: Union[str, Sequence[str], None] = "a8c3f5e71d26"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Раніше created_at/updated_at писав now() у колонку timestamp без поясу,
+# тобто місцевий час сервера (TimeZone сесії); тепер застосунок пише UTC.
+# Міграція запускається до старту нового коду, з тим самим TimeZone
+TO_UTC = """
+UPDATE repair_requests SET
+    created_at = (created_at AT TIME ZONE current_setting('TimeZone')) AT TIME ZONE 'UTC',
+    updated_at = (updated_at AT TIME ZONE current_setting('TimeZone')) AT TIME ZONE 'UTC'
+"""
+
+FROM_UTC = """
+UPDATE repair_requests SET
+    created_at = (created_at AT TIME ZONE 'UTC') AT TIME ZONE current_setting('TimeZone'),
+    updated_at = (updated_at AT TIME ZONE 'UTC') AT TIME ZONE current_setting('TimeZone')
+"""
+
+# Дні надходження рахуються від created_at, тож після зсуву перераховуються
+REBUILD_DAILY_INTAKE = [
+    "DELETE FROM report_daily_intake",
+    """
+    INSERT INTO report_daily_intake (day, count)
+    SELECT CAST(created_at AS date), count(*) FROM repair_requests GROUP BY 1
+    """,
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("LOCK TABLE repair_requests IN SHARE ROW EXCLUSIVE MODE")
+    op.execute(TO_UTC)
+    for statement in REBUILD_DAILY_INTAKE:
+        op.execute(statement)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("LOCK TABLE repair_requests IN SHARE ROW EXCLUSIVE MODE")
+    op.execute(FROM_UTC)
+    for statement in REBUILD_DAILY_INTAKE:
+        op.execute(statement)
@@ -0,0 +1,49 @@
+"""add full text search
+
+Revision ID: d41c7a9e3b58
+Revises: b7d2e9f4a610
+Create Date: 2026-10-18 16:20:11.402913
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "d41c7a9e3b58"
+down_revision: Union[str, Sequence[str], None] = "b7d2e9f4a610"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+SEARCHABLE = (("repair_requests", "description"), ("admin_messages", "message"))
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Згенерована STORED-колонка заповнюється для всіх рядків одразу
+    # (перезапис таблиці), далі Postgres оновлює її сам при кожному записі
+    for table, text_column in SEARCHABLE:
+        op.execute(
+            f"""
+            ALTER TABLE {table} ADD COLUMN search_vector tsvector
+            GENERATED ALWAYS AS (
+                to_tsvector('simple', coalesce({text_column}, ''))
+            ) STORED
+            """
+        )
+        op.create_index(
+            f"ix_{table}_search_vector",
+            table,
+            ["search_vector"],
+            unique=False,
+            postgresql_using="gin",
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table, _ in SEARCHABLE:
+        op.drop_index(f"ix_{table}_search_vector", table_name=table)
+        op.drop_column(table, "search_vector")
@@ -0,0 +1,157 @@
+"""add report summary tables
+
+Revision ID: e58a2f1c9d07
+Revises: d41c7a9e3b58
+Create Date: 2026-10-18 17:02:44.118305
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = "e58a2f1c9d07"
+down_revision: Union[str, Sequence[str], None] = "d41c7a9e3b58"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+REPORT_FUNCTION = """
+CREATE OR REPLACE FUNCTION report_repair_change() RETURNS trigger AS $$
+DECLARE
+    seconds double precision;
+BEGIN
+    IF TG_OP = 'UPDATE' AND OLD.status = NEW.status
+            AND OLD.admin_id IS NOT DISTINCT FROM NEW.admin_id THEN
+        RETURN NULL;
+    END IF;
+
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        UPDATE report_status_counts SET count = count - 1
+        WHERE status = OLD.status;
+        IF OLD.admin_id IS NOT NULL AND OLD.status IN ('NEW', 'IN_PROGRESS', 'MESSAGE') THEN
+            UPDATE report_admin_workload SET open_count = open_count - 1
+            WHERE admin_id = OLD.admin_id;
+        END IF;
+    END IF;
+
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        INSERT INTO report_status_counts (status, count) VALUES (NEW.status, 1)
+        ON CONFLICT (status) DO UPDATE SET count = report_status_counts.count + 1;
+        IF NEW.admin_id IS NOT NULL AND NEW.status IN ('NEW', 'IN_PROGRESS', 'MESSAGE') THEN
+            INSERT INTO report_admin_workload (admin_id, open_count)
+            VALUES (NEW.admin_id, 1)
+            ON CONFLICT (admin_id) DO UPDATE
+            SET open_count = report_admin_workload.open_count + 1;
+        END IF;
+    END IF;
+
+    IF TG_OP = 'INSERT' THEN
+        INSERT INTO report_daily_intake (day, count)
+        VALUES (CAST(NEW.created_at AS date), 1)
+        ON CONFLICT (day) DO UPDATE SET count = report_daily_intake.count + 1;
+    END IF;
+
+    IF TG_OP = 'UPDATE' AND NEW.status = 'COMPLETED' AND OLD.status <> 'COMPLETED' THEN
+        seconds := greatest(extract(epoch FROM localtimestamp - NEW.created_at), 0);
+        INSERT INTO report_completion_hours (hour, count, total_seconds)
+        VALUES (floor(seconds / 3600), 1, seconds)
+        ON CONFLICT (hour) DO UPDATE
+        SET count = report_completion_hours.count + 1,
+            total_seconds = report_completion_hours.total_seconds + EXCLUDED.total_seconds;
+    END IF;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql
+"""
+
+REPORT_TRIGGER = """
+CREATE TRIGGER repair_requests_report
+AFTER INSERT OR DELETE OR UPDATE OF status, admin_id ON repair_requests
+FOR EACH ROW EXECUTE FUNCTION report_repair_change()
+"""
+
+# Початкове заповнення з наявних заявок. Для вже завершених заявок момент
+# завершення невідомий, тому береться updated_at
+BACKFILL = [
+    """
+    INSERT INTO report_status_counts (status, count)
+    SELECT status, count(*) FROM repair_requests GROUP BY status
+    """,
+    """
+    INSERT INTO report_admin_workload (admin_id, open_count)
+    SELECT admin_id, count(*) FROM repair_requests
+    WHERE admin_id IS NOT NULL AND status IN ('NEW', 'IN_PROGRESS', 'MESSAGE')
+    GROUP BY admin_id
+    """,
+    """
+    INSERT INTO report_daily_intake (day, count)
+    SELECT CAST(created_at AS date), count(*) FROM repair_requests GROUP BY 1
+    """,
+    """
+    INSERT INTO report_completion_hours (hour, count, total_seconds)
+    SELECT floor(seconds / 3600), count(*), sum(seconds)
+    FROM (
+        SELECT greatest(extract(epoch FROM updated_at - created_at), 0) AS seconds
+        FROM repair_requests WHERE status = 'COMPLETED'
+    ) AS completed
+    GROUP BY 1
+    """,
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "report_status_counts",
+        sa.Column(
+            "status",
+            postgresql.ENUM(name="request_status", create_type=False),
+            nullable=False,
+        ),
+        sa.Column("count", sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint("status"),
+    )
+    op.create_table(
+        "report_admin_workload",
+        sa.Column("admin_id", sa.Integer(), nullable=False),
+        sa.Column("open_count", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(
+            ["admin_id"],
+            ["users.id"],
+        ),
+        sa.PrimaryKeyConstraint("admin_id"),
+    )
+    op.create_table(
+        "report_daily_intake",
+        sa.Column("day", sa.Date(), nullable=False),
+        sa.Column("count", sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint("day"),
+    )
+    op.create_table(
+        "report_completion_hours",
+        sa.Column("hour", sa.Integer(), nullable=False),
+        sa.Column("count", sa.Integer(), nullable=False),
+        sa.Column("total_seconds", sa.Float(), nullable=False),
+        sa.PrimaryKeyConstraint("hour"),
+    )
+
+    # Заявки не змінюються між заповненням та появою тригера
+    op.execute("LOCK TABLE repair_requests IN SHARE ROW EXCLUSIVE MODE")
+    for statement in BACKFILL:
+        op.execute(statement)
+    op.execute(REPORT_FUNCTION)
+    op.execute(REPORT_TRIGGER)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP TRIGGER IF EXISTS repair_requests_report ON repair_requests")
+    op.execute("DROP FUNCTION IF EXISTS report_repair_change()")
+    op.drop_table("report_completion_hours")
+    op.drop_table("report_daily_intake")
+    op.drop_table("report_admin_workload")
+    op.drop_table("report_status_counts")
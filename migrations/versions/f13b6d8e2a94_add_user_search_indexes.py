@@ -0,0 +1,40 @@
+"""add user search indexes
+
+Revision ID: f13b6d8e2a94
+Revises: e58a2f1c9d07
+Create Date: 2026-10-18 18:11:09.730562
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "f13b6d8e2a94"
+down_revision: Union[str, Sequence[str], None] = "e58a2f1c9d07"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        "ix_users_lower_username",
+        "users",
+        [sa.text("lower(username) varchar_pattern_ops")],
+        unique=False,
+    )
+    op.create_index(
+        "ix_users_lower_email",
+        "users",
+        [sa.text("lower(email) varchar_pattern_ops")],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_users_lower_email", table_name="users")
+    op.drop_index("ix_users_lower_username", table_name="users")
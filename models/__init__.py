@@ -1 +1,2 @@
 from .models import *
+from . import reports, search  # тригери та DDL поза ORM-моделями для create_all
@@ -0,0 +1,80 @@
+"""Профілі завантаження зв'язків.
+
+Усі relationship у моделях ліниві (lazy="select"), тому кожен запит явно
+вказує, що йому потрібно: select(RepairRequest).options(*REPAIR_WITH_THREAD).
+Списки читають не ORM-об'єкти, а колонки REPAIR_LIST_COLUMNS.
+"""
+
+from sqlalchemy import select
+from sqlalchemy.orm import aliased, joinedload, selectinload
+
+from .models import AdminMessage, RepairRequest, User
+
+# Сторінка заявки: автор, майстер та переписка
+REPAIR_WITH_THREAD = (
+    joinedload(RepairRequest.user, innerjoin=True).load_only(
+        User.id, User.username, User.email
+    ),
+    joinedload(RepairRequest.admin).load_only(User.id, User.username),
+    selectinload(RepairRequest.messages)
+    .joinedload(AdminMessage.admin)
+    .load_only(User.id, User.username),
+)
+
+# Проєкція рядка списку заявок: лише колонки, без ORM-об'єктів та identity map
+AdminUser = aliased(User, name="admin_user")
+
+REPAIR_LIST_COLUMNS = (
+    select(
+        RepairRequest.id,
+        RepairRequest.description,
+        RepairRequest.photo_url,
+        RepairRequest.status,
+        RepairRequest.required_time,
+        RepairRequest.created_at,
+        RepairRequest.updated_at,
+        RepairRequest.user_id,
+        RepairRequest.admin_id,
+        User.username.label("user_username"),
+        AdminUser.username.label("admin_username"),
+    )
+    .join(User, RepairRequest.user_id == User.id)
+    .outerjoin(AdminUser, RepairRequest.admin_id == AdminUser.id)
+)
+
+
+def repair_row_dict(row) -> dict:
+    """Рядок REPAIR_LIST_COLUMNS у формі RepairRequestOut_schemas"""
+    data = row._asdict()
+    user_username = data.pop("user_username")
+    admin_username = data.pop("admin_username")
+    data["user"] = {"id": data["user_id"], "username": user_username}
+    data["admin"] = (
+        {"id": data["admin_id"], "username": admin_username}
+        if data["admin_id"] is not None
+        else None
+    )
+    return data
+
+
+# Той самий рядок для UPDATE ... RETURNING: імена через корельовані підзапити,
+# щоб мутація віддавала готовий рядок без повторного SELECT
+REPAIR_RETURNING = (
+    RepairRequest.id,
+    RepairRequest.description,
+    RepairRequest.photo_url,
+    RepairRequest.status,
+    RepairRequest.required_time,
+    RepairRequest.created_at,
+    RepairRequest.updated_at,
+    RepairRequest.user_id,
+    RepairRequest.admin_id,
+    select(User.username)
+    .where(User.id == RepairRequest.user_id)
+    .scalar_subquery()
+    .label("user_username"),
+    select(AdminUser.username)
+    .where(AdminUser.id == RepairRequest.admin_id)
+    .scalar_subquery()
+    .label("admin_username"),
+)
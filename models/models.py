@@ -1,14 +1,33 @@
 import datetime as dt
 from enum import Enum
 
-from sqlalchemy import Boolean, DateTime
+from sqlalchemy import Boolean, Date, DateTime, Float
 from sqlalchemy import Enum as SQLEnum
-from sqlalchemy import ForeignKey, String, Text, func
+from sqlalchemy import ForeignKey, Index, Integer, String, Text, func, text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from settings import Base
 
 
+def utcnow() -> dt.datetime:
+    return dt.datetime.now(dt.timezone.utc)
+
+
+def utcnow_naive() -> dt.datetime:
+    # Час заявок - UTC без поясу, заданий у Python, а не func.now(): у SQLite
+    # CURRENT_TIMESTAMP пише '...:26' без мікросекунд, а курсори (created_at, id)
+    # та since зв'язуються як '...:26.000000', і текстове порівняння дає повтори.
+    # Старі рядки Postgres (місцевий час сервера) переводить у UTC міграція
+    return utcnow().replace(tzinfo=None)
+
+
+def as_utc_naive(value: dt.datetime) -> dt.datetime:
+    """Значення з поясом - у UTC без поясу, як зберігаються часи заявок"""
+    if value.tzinfo is None:
+        return value
+    return value.astimezone(dt.timezone.utc).replace(tzinfo=None)
+
+
 class RequestStatus(str, Enum):
     NEW = "Нова"
     IN_PROGRESS = "В обробці"
@@ -22,7 +41,7 @@ class User(Base):
     __tablename__ = "users"
 
     id: Mapped[int] = mapped_column(primary_key=True)
-    username: Mapped[str] = mapped_column(String(50), nullable=False)
+    username: Mapped[str] = mapped_column(String(50), nullable=False, index=True)
     email: Mapped[str] = mapped_column(String(50), unique=True, nullable=False)
     password: Mapped[str] = mapped_column(
         String(255), nullable=False
@@ -34,29 +53,49 @@ class User(Base):
         "RepairRequest",
         back_populates="user",
         foreign_keys="RepairRequest.user_id",
-        lazy="selectin",
     )
 
     assigned_repairs: Mapped[list["RepairRequest"]] = relationship(
         "RepairRequest",
         back_populates="admin",
         foreign_keys="RepairRequest.admin_id",
-        lazy="selectin",
     )
 
     admin_messages: Mapped[list["AdminMessage"]] = relationship(
         "AdminMessage",
         back_populates="admin",
         foreign_keys="AdminMessage.admin_id",
-        lazy="selectin",
     )
 
     def __str__(self):
         return f"<User> з {self.id} та {self.username}"
 
 
+# Пошук користувачів за початком username/email без урахування регістру
+Index(
+    "ix_users_lower_username",
+    func.lower(User.username).label("lower_username"),
+    postgresql_ops={"lower_username": "varchar_pattern_ops"},
+)
+Index(
+    "ix_users_lower_email",
+    func.lower(User.email).label("lower_email"),
+    postgresql_ops={"lower_email": "varchar_pattern_ops"},
+)
+
+
 class RepairRequest(Base):
     __tablename__ = "repair_requests"
+    # Індекси під keyset-пагінацію (created_at, id) з фільтрами списків
+    __table_args__ = (
+        Index("ix_repair_requests_created_at_id", "created_at", "id"),
+        Index("ix_repair_requests_status_created_at", "status", "created_at", "id"),
+        Index("ix_repair_requests_user_id_created_at", "user_id", "created_at", "id"),
+        Index("ix_repair_requests_admin_id_created_at", "admin_id", "created_at", "id"),
+        # Інкрементальна синхронізація since=(updated_at, id)
+        Index("ix_repair_requests_updated_at_id", "updated_at", "id"),
+        Index("ix_repair_requests_user_id_updated_at", "user_id", "updated_at", "id"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True)
     description: Mapped[str] = mapped_column(Text, nullable=False)
@@ -69,9 +108,9 @@ class RepairRequest(Base):
         SQLEnum(RequestStatus, name="request_status"), default=RequestStatus.NEW.value
     )
 
-    created_at: Mapped[dt.datetime] = mapped_column(DateTime, default=func.now())
+    created_at: Mapped[dt.datetime] = mapped_column(DateTime, default=utcnow_naive)
     updated_at: Mapped[dt.datetime] = mapped_column(
-        DateTime, default=func.now(), onupdate=func.now()
+        DateTime, default=utcnow_naive, onupdate=utcnow_naive
     )
 
     user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), nullable=False)
@@ -81,21 +120,18 @@ class RepairRequest(Base):
         "User",
         back_populates="repair_requests",
         foreign_keys=[user_id],
-        lazy="selectin",
     )
 
     admin: Mapped["User"] = relationship(
         "User",
         back_populates="assigned_repairs",
         foreign_keys=[admin_id],
-        lazy="selectin",
     )
 
     messages: Mapped[list["AdminMessage"]] = relationship(
         "AdminMessage",
         back_populates="repair_request",
         foreign_keys="AdminMessage.request_id",
-        lazy="selectin",
     )
 
     def __str__(self):
@@ -104,11 +140,14 @@ class RepairRequest(Base):
 
 class AdminMessage(Base):
     __tablename__ = "admin_messages"
+    __table_args__ = (
+        Index("ix_admin_messages_request_id_created_at", "request_id", "created_at"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True, index=True)
     message: Mapped[str] = mapped_column(Text, nullable=False)
     created_at: Mapped[dt.datetime] = mapped_column(
-        DateTime(timezone=True), default=func.now()
+        DateTime(timezone=True), default=utcnow
     )
 
     request_id: Mapped[int] = mapped_column(
@@ -143,7 +182,79 @@ class Rewiews(Base):
 class Users_in_Telegram(Base):
     __tablename__ = "users_in_telegram"
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
-    tg_code: Mapped[str] = mapped_column(String(50))
+    tg_code: Mapped[str] = mapped_column(String(50), index=True)
+
+    user_tg_id: Mapped[str] = mapped_column(String(255), nullable=True, index=True)
+    user_in_site: Mapped[int] = mapped_column(ForeignKey("users.id"), index=True)
+
+
+class NotificationOutbox(Base):
+    """Черга Telegram-сповіщень, пишеться в одній транзакції зі зміною заявки"""
+
+    __tablename__ = "notification_outbox"
+    __table_args__ = (
+        Index(
+            "ix_notification_outbox_pending",
+            "next_attempt_at",
+            postgresql_where=text("sent_at IS NULL"),
+            sqlite_where=text("sent_at IS NULL"),
+        ),
+    )
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), nullable=False)
+    message: Mapped[str] = mapped_column(Text, nullable=False)
+
+    attempts: Mapped[int] = mapped_column(Integer, default=0)
+    last_error: Mapped[str] = mapped_column(Text, nullable=True)
+
+    created_at: Mapped[dt.datetime] = mapped_column(
+        DateTime(timezone=True), default=utcnow
+    )
+    next_attempt_at: Mapped[dt.datetime] = mapped_column(
+        DateTime(timezone=True), default=utcnow
+    )
+    sent_at: Mapped[dt.datetime] = mapped_column(DateTime(timezone=True), nullable=True)
+
+
+# Зведені таблиці звітів. Пишуться лише тригерами на repair_requests
+# (models/reports.py), тож читання звіту не залежить від кількості заявок
+
+
+class ReportStatusCount(Base):
+    """Кількість заявок у кожному статусі"""
+
+    __tablename__ = "report_status_counts"
+
+    status: Mapped[RequestStatus] = mapped_column(
+        SQLEnum(RequestStatus, name="request_status"), primary_key=True
+    )
+    count: Mapped[int] = mapped_column(Integer, default=0)
+
+
+class ReportAdminWorkload(Base):
+    """Відкриті (не завершені та не скасовані) заявки кожного майстра"""
+
+    __tablename__ = "report_admin_workload"
+
+    admin_id: Mapped[int] = mapped_column(ForeignKey("users.id"), primary_key=True)
+    open_count: Mapped[int] = mapped_column(Integer, default=0)
+
+
+class ReportDailyIntake(Base):
+    """Кількість нових заявок за день (за created_at)"""
+
+    __tablename__ = "report_daily_intake"
+
+    day: Mapped[dt.date] = mapped_column(Date, primary_key=True)
+    count: Mapped[int] = mapped_column(Integer, default=0)
+
+
+class ReportCompletionTime(Base):
+    """Гістограма часу від створення до COMPLETED з кроком в годину"""
+
+    __tablename__ = "report_completion_hours"
 
-    user_tg_id: Mapped[str] = mapped_column(String(255), nullable=True)
-    user_in_site: Mapped[int] = mapped_column(ForeignKey("users.id"))
+    hour: Mapped[int] = mapped_column(Integer, primary_key=True)
+    count: Mapped[int] = mapped_column(Integer, default=0)
+    total_seconds: Mapped[float] = mapped_column(Float, default=0)
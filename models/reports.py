@@ -0,0 +1,172 @@
+"""Тригери, що інкрементально ведуть зведені таблиці звітів.
+
+На кожен INSERT/DELETE заявок та зміну status або admin_id тригери змінюють
+по одному рядку на ключ у report_* таблицях, тож звіт читає кілька рядків
+замість GROUP BY по repair_requests. Тригери працюють для всіх шляхів запису
+(роути, масові UPDATE, бот), без коду в застосунку.
+
+Postgres: тригери FOR EACH STATEMENT з таблицями переходів, по одному на
+подію. SQLite (розробка): рядкові тригери; записи там і так послідовні.
+Для Postgres схему створює міграція, для create_all - DDL-події нижче.
+"""
+
+from sqlalchemy import DDL, event
+
+from settings import Base
+
+# Статуси, в яких заявка входить до навантаження майстра
+OPEN_STATUSES = "('NEW', 'IN_PROGRESS', 'MESSAGE')"
+
+# Зміни однієї інструкції як рядки (status, admin_id, delta): +1 для нового
+# стану заявки, -1 для старого. UPDATE без зміни status та admin_id не дає рядків
+PG_DELTAS = {
+    "INSERT": "SELECT status, admin_id, 1 AS delta FROM new_rows",
+    "DELETE": "SELECT status, admin_id, -1 AS delta FROM old_rows",
+    "UPDATE": """
+        SELECT n.status, n.admin_id, 1 AS delta
+        FROM new_rows n JOIN old_rows o USING (id)
+        WHERE n.status <> o.status OR n.admin_id IS DISTINCT FROM o.admin_id
+        UNION ALL
+        SELECT o.status, o.admin_id, -1 AS delta
+        FROM new_rows n JOIN old_rows o USING (id)
+        WHERE n.status <> o.status OR n.admin_id IS DISTINCT FROM o.admin_id
+    """,
+}
+
+
+def pg_report_function(op: str) -> str:
+    """Функція тригера FOR EACH STATEMENT для однієї операції.
+
+    Зміни агрегуються по ключу лічильника і застосовуються в порядку ключа:
+    кілька масових змін статусу одночасно беруть блокування рядків
+    лічильників в одному порядку і не можуть взаємно заблокуватись.
+    """
+    deltas = PG_DELTAS[op]
+    statements = [
+        f"""
+        INSERT INTO report_status_counts (status, count)
+        SELECT status, sum(delta) FROM ({deltas}) AS d
+        GROUP BY status HAVING sum(delta) <> 0 ORDER BY status
+        ON CONFLICT (status) DO UPDATE
+        SET count = report_status_counts.count + EXCLUDED.count;
+        """,
+        f"""
+        INSERT INTO report_admin_workload (admin_id, open_count)
+        SELECT admin_id, sum(delta) FROM ({deltas}) AS d
+        WHERE admin_id IS NOT NULL AND status IN {OPEN_STATUSES}
+        GROUP BY admin_id HAVING sum(delta) <> 0 ORDER BY admin_id
+        ON CONFLICT (admin_id) DO UPDATE
+        SET open_count = report_admin_workload.open_count + EXCLUDED.open_count;
+        """,
+    ]
+    if op == "INSERT":
+        statements.append(
+            """
+        INSERT INTO report_daily_intake (day, count)
+        SELECT CAST(created_at AS date), count(*) FROM new_rows
+        GROUP BY 1 ORDER BY 1
+        ON CONFLICT (day) DO UPDATE SET count = report_daily_intake.count + EXCLUDED.count;
+        """
+        )
+    if op == "UPDATE":
+        # Час виконання - від створення до запису статусу (обидва в UTC)
+        statements.append(
+            """
+        INSERT INTO report_completion_hours (hour, count, total_seconds)
+        SELECT floor(seconds / 3600), count(*), sum(seconds)
+        FROM (
+            SELECT greatest(extract(epoch FROM n.updated_at - n.created_at), 0) AS seconds
+            FROM new_rows n JOIN old_rows o USING (id)
+            WHERE n.status = 'COMPLETED' AND o.status <> 'COMPLETED'
+        ) AS completed
+        GROUP BY 1 ORDER BY 1
+        ON CONFLICT (hour) DO UPDATE
+        SET count = report_completion_hours.count + EXCLUDED.count,
+            total_seconds = report_completion_hours.total_seconds + EXCLUDED.total_seconds;
+        """
+        )
+    body = "".join(statements)
+    return f"""
+    CREATE OR REPLACE FUNCTION report_repair_{op.lower()}() RETURNS trigger AS $$
+    BEGIN{body}
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql
+    """
+
+
+# Тригери з таблицями переходів не можуть мати кількох подій чи списку колонок
+PG_TRIGGER_REFERENCING = {
+    "INSERT": "REFERENCING NEW TABLE AS new_rows",
+    "DELETE": "REFERENCING OLD TABLE AS old_rows",
+    "UPDATE": "REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows",
+}
+
+
+def pg_report_trigger(op: str) -> str:
+    return f"""
+    CREATE TRIGGER repair_requests_report_{op.lower()}
+    AFTER {op} ON repair_requests {PG_TRIGGER_REFERENCING[op]}
+    FOR EACH STATEMENT EXECUTE FUNCTION report_repair_{op.lower()}()
+    """
+
+
+PG_DDL = [pg_report_function(op) for op in PG_DELTAS] + [
+    pg_report_trigger(op) for op in PG_DELTAS
+]
+
+SQLITE_DDL = [
+    f"""
+    CREATE TRIGGER IF NOT EXISTS repair_requests_report_ai AFTER INSERT ON repair_requests BEGIN
+        INSERT INTO report_status_counts (status, count) VALUES (new.status, 1)
+        ON CONFLICT (status) DO UPDATE SET count = count + 1;
+        INSERT INTO report_admin_workload (admin_id, open_count)
+        SELECT new.admin_id, 1
+        WHERE new.admin_id IS NOT NULL AND new.status IN {OPEN_STATUSES}
+        ON CONFLICT (admin_id) DO UPDATE SET open_count = open_count + 1;
+        INSERT INTO report_daily_intake (day, count) VALUES (date(new.created_at), 1)
+        ON CONFLICT (day) DO UPDATE SET count = count + 1;
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS repair_requests_report_au
+    AFTER UPDATE OF status, admin_id ON repair_requests
+    WHEN old.status IS NOT new.status OR old.admin_id IS NOT new.admin_id
+    BEGIN
+        UPDATE report_status_counts SET count = count - 1 WHERE status = old.status;
+        INSERT INTO report_status_counts (status, count) VALUES (new.status, 1)
+        ON CONFLICT (status) DO UPDATE SET count = count + 1;
+        UPDATE report_admin_workload SET open_count = open_count - 1
+        WHERE admin_id = old.admin_id AND old.status IN {OPEN_STATUSES};
+        INSERT INTO report_admin_workload (admin_id, open_count)
+        SELECT new.admin_id, 1
+        WHERE new.admin_id IS NOT NULL AND new.status IN {OPEN_STATUSES}
+        ON CONFLICT (admin_id) DO UPDATE SET open_count = open_count + 1;
+        INSERT INTO report_completion_hours (hour, count, total_seconds)
+        SELECT CAST(seconds / 3600 AS INTEGER), 1, seconds
+        FROM (
+            SELECT max((julianday(new.updated_at) - julianday(new.created_at)) * 86400, 0) AS seconds
+        )
+        WHERE new.status = 'COMPLETED' AND old.status <> 'COMPLETED'
+        ON CONFLICT (hour) DO UPDATE
+        SET count = count + 1, total_seconds = total_seconds + excluded.total_seconds;
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS repair_requests_report_ad AFTER DELETE ON repair_requests BEGIN
+        UPDATE report_status_counts SET count = count - 1 WHERE status = old.status;
+        UPDATE report_admin_workload SET open_count = open_count - 1
+        WHERE admin_id = old.admin_id AND old.status IN {OPEN_STATUSES};
+    END
+    """,
+]
+
+# Після створення всіх таблиць: тригери посилаються на report_* таблиці
+for statement in PG_DDL:
+    event.listen(
+        Base.metadata, "after_create", DDL(statement).execute_if(dialect="postgresql")
+    )
+for statement in SQLITE_DDL:
+    event.listen(
+        Base.metadata, "after_create", DDL(statement).execute_if(dialect="sqlite")
+    )
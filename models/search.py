@@ -0,0 +1,117 @@
+"""Повнотекстовий індекс описів заявок та повідомлень майстрів.
+
+Postgres: згенеровані колонки search_vector (tsvector) з GIN-індексами,
+база сама оновлює їх при INSERT/UPDATE. SQLite (розробка): FTS5-таблиці
+з external content, які синхронізуються тригерами.
+
+Колонок немає в ORM-моделях, бо вони існують лише в одному діалекті;
+запити будують через легкі table() нижче. Для Postgres схему створює
+міграція, для create_all (mock_data, scripts) - DDL-події цього модуля,
+а alembic autogenerate пропускає їх через is_search_object().
+"""
+
+from sqlalchemy import DDL, event
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.sql import column, table
+
+from .models import AdminMessage, RepairRequest
+
+# Конфігурація 'simple': без стемінгу, працює з українським текстом
+TS_CONFIG = "simple"
+
+# Моделі та текстові колонки, що індексуються
+SEARCHABLE = ((RepairRequest, "description"), (AdminMessage, "message"))
+SEARCH_TABLES = {model.__tablename__ for model, _ in SEARCHABLE}
+SEARCH_COLUMN = "search_vector"
+
+
+def search_index_name(tablename: str) -> str:
+    return f"ix_{tablename}_{SEARCH_COLUMN}"
+
+
+def is_search_object(object_, name: str, type_: str) -> bool:
+    """Колонка, GIN-індекс або FTS5-таблиця (з її службовими) цього модуля"""
+    if type_ == "column":
+        return name == SEARCH_COLUMN and object_.table.name in SEARCH_TABLES
+    if type_ == "index":
+        return name in {search_index_name(t) for t in SEARCH_TABLES}
+    if type_ == "table":
+        return any(name.startswith(f"{t}_fts") for t in SEARCH_TABLES)
+    return False
+
+
+def pg_ddl(tablename: str, text_column: str) -> list[str]:
+    return [
+        f"""
+        ALTER TABLE {tablename} ADD COLUMN {SEARCH_COLUMN} tsvector
+        GENERATED ALWAYS AS (
+            to_tsvector('{TS_CONFIG}', coalesce({text_column}, ''))
+        ) STORED
+        """,
+        f"CREATE INDEX {search_index_name(tablename)} ON {tablename} "
+        f"USING gin ({SEARCH_COLUMN})",
+    ]
+
+
+def sqlite_ddl(tablename: str, text_column: str) -> list[str]:
+    fts = f"{tablename}_fts"
+    return [
+        f"""
+        CREATE VIRTUAL TABLE {fts} USING fts5(
+            {text_column}, content='{tablename}', content_rowid='id',
+            tokenize='unicode61 remove_diacritics 2'
+        )
+        """,
+        f"""
+        CREATE TRIGGER {fts}_ai AFTER INSERT ON {tablename} BEGIN
+            INSERT INTO {fts}(rowid, {text_column}) VALUES (new.id, new.{text_column});
+        END
+        """,
+        f"""
+        CREATE TRIGGER {fts}_ad AFTER DELETE ON {tablename} BEGIN
+            INSERT INTO {fts}({fts}, rowid, {text_column})
+            VALUES ('delete', old.id, old.{text_column});
+        END
+        """,
+        f"""
+        CREATE TRIGGER {fts}_au AFTER UPDATE OF {text_column} ON {tablename} BEGIN
+            INSERT INTO {fts}({fts}, rowid, {text_column})
+            VALUES ('delete', old.id, old.{text_column});
+            INSERT INTO {fts}(rowid, {text_column}) VALUES (new.id, new.{text_column});
+        END
+        """,
+    ]
+
+
+for model, text_column in SEARCHABLE:
+    tablename = model.__tablename__
+    for statement in pg_ddl(tablename, text_column):
+        event.listen(
+            model.__table__,
+            "after_create",
+            DDL(statement).execute_if(dialect="postgresql"),
+        )
+    for statement in sqlite_ddl(tablename, text_column):
+        event.listen(
+            model.__table__,
+            "after_create",
+            DDL(statement).execute_if(dialect="sqlite"),
+        )
+    event.listen(
+        model.__table__,
+        "before_drop",
+        DDL(f"DROP TABLE IF EXISTS {tablename}_fts").execute_if(dialect="sqlite"),
+    )
+
+
+# Postgres: ті самі таблиці, але з колонкою search_vector
+repair_requests_ts = table(
+    "repair_requests", column("id"), column("search_vector", TSVECTOR)
+)
+admin_messages_ts = table(
+    "admin_messages", column("request_id"), column("search_vector", TSVECTOR)
+)
+
+# SQLite: FTS5-таблиці, rowid = id рядка основної таблиці
+repair_requests_fts = table("repair_requests_fts", column("rowid"), column("description"))
+admin_messages_fts = table("admin_messages_fts", column("rowid"), column("message"))
@@ -1,111 +1,248 @@
-from fastapi import APIRouter, Depends, HTTPException, Query, status
-from sqlalchemy import select
+import asyncio
+import datetime as dt
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from sqlalchemy import insert, literal, select, tuple_, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from models import AdminMessage, RepairRequest, RequestStatus, User
-from routes.auth import get_current_user, require_admin
-from settings import get_db
-from tg_bot import send_msg
+from models import AdminMessage, RepairRequest, RequestStatus, User, as_utc_naive
+from models.loading import (REPAIR_LIST_COLUMNS, REPAIR_RETURNING,
+                            repair_row_dict)
+from routes.auth import get_current_user, require_admin, require_admin_cookie
+from schemas.request import (BulkRepairIds_schemas, BulkResultOut_schemas,
+                             BulkStatusChange_schemas, RepairRequestOut_schemas,
+                             RepairRequestPageOut_schemas,
+                             RepairRequestSearchOut_schemas,
+                             RepairRequestSyncOut_schemas)
+from schemas.user import UserPageOut
+from settings import async_engine, get_db, pool_stats
+from tools.auth import identities, token_cache
+from tools.cache import invalidate_repair_lists, repair_lists
+from tools.events import format_sse, publish_repair, repair_events
+from tools.notifications import queue_notification, queue_notifications
+from tools.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, build_page
+from tools.repairs import list_repairs
+from tools.reports import (DEFAULT_REPORT_DAYS, TOTAL_REPAIRS, load_report,
+                           load_status_counts)
+from tools.search import search_repairs
+from tools.sync import (changed_since, list_version, not_modified, parse_cursor,
+                        version_headers)
+from tools.templates import page_cache
+from tools.users import list_users
 
 router = APIRouter()
 
 
-@router.get("/repairs")
+@router.get(
+    "/repairs",
+    response_model=RepairRequestPageOut_schemas | RepairRequestSyncOut_schemas,
+)
 async def get_all_repairs(
-    new: int = Query(0),
+    request: Request,
+    status_filter: RequestStatus | None = Query(None, alias="status"),
+    admin_id: int | None = Query(None),
+    user_id: int | None = Query(None),
+    created_from: dt.datetime | None = Query(None),
+    created_to: dt.datetime | None = Query(None),
+    cursor: str | None = Query(None),
+    since: str | None = Query(None),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    current_user: dict = Depends(require_admin),
+    db: AsyncSession = Depends(get_db),
+):
+    """Список заявок з keyset-пагінацією по (created_at, id) та фільтрами.
+
+    since=<cursor> повертає лише змінені після курсора заявки; зміна, що
+    закомітилась пізніше, ніж курсор пройшов її updated_at (довга
+    транзакція), since не потрапляє - її приносить /admin/events. Перша
+    сторінка та since мають ETag; при збігу If-None-Match повертається 304
+    без читання рядків. Без фільтрів версія береться зі зведеної таблиці
+    статусів та індексу updated_at, тож не залежить від кількості заявок.
+    Сторінки кешуються до наступного запису будь-якої заявки.
+    """
+    conditions = []
+    if status_filter is not None:
+        conditions.append(RepairRequest.status == status_filter)
+    if admin_id is not None:
+        conditions.append(RepairRequest.admin_id == admin_id)
+    if user_id is not None:
+        conditions.append(RepairRequest.user_id == user_id)
+    if created_from is not None:
+        conditions.append(RepairRequest.created_at >= as_utc_naive(created_from))
+    if created_to is not None:
+        conditions.append(RepairRequest.created_at < as_utc_naive(created_to))
+
+    async def build():
+        headers = {}
+        # Наступні сторінки клієнт не перевіряє через If-None-Match
+        if since or not cursor:
+            etag, sync_cursor = await list_version(
+                db,
+                RepairRequest,
+                conditions,
+                request,
+                count=None if conditions else TOTAL_REPAIRS,
+            )
+            if cached := not_modified(request, etag):
+                return cached
+            headers = version_headers(etag, sync_cursor)
+
+        stmt = REPAIR_LIST_COLUMNS.where(*conditions)
+
+        if since:
+            page = await changed_since(
+                db, stmt, RepairRequest, since, limit, serialize=repair_row_dict
+            )
+            return ORJSONResponse(page, headers=headers)
+
+        if cursor:
+            cursor_created_at, cursor_id = parse_cursor(cursor)
+            stmt = stmt.where(
+                tuple_(RepairRequest.created_at, RepairRequest.id)
+                < tuple_(cursor_created_at, cursor_id)
+            )
+
+        stmt = stmt.order_by(
+            RepairRequest.created_at.desc(), RepairRequest.id.desc()
+        ).limit(limit + 1)
+
+        rows = (await db.execute(stmt)).all()
+        return ORJSONResponse(
+            build_page(rows, limit, serialize=repair_row_dict), headers=headers
+        )
+
+    return await repair_lists.respond(request, ("all",), build)
+
+
+@router.get("/repairs/search", response_model=RepairRequestSearchOut_schemas)
+async def search_all_repairs(
+    q: str = Query(..., min_length=1, max_length=200),
+    status_filter: RequestStatus | None = Query(None, alias="status"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    offset: int = Query(0, ge=0),
     current_user: dict = Depends(require_admin),
     db: AsyncSession = Depends(get_db),
 ):
-    if new == 1:
-        stmt = select(RepairRequest).where(RepairRequest.status == RequestStatus.NEW)
-    else:
-        stmt = select(RepairRequest)
+    """Повнотекстовий пошук по описах заявок та повідомленнях майстрів.
 
-    repairs = await db.scalars(stmt)
-    return repairs.all()
+    Результати впорядковані за релевантністю; наступна сторінка - offset=next_offset.
+    """
+    conditions = []
+    if status_filter is not None:
+        conditions.append(RepairRequest.status == status_filter)
 
+    page = await search_repairs(db, q, conditions, limit, offset)
+    return ORJSONResponse(page)
 
-@router.post("/repair/{repair_id}/self/get")
+
+@router.post("/repair/{repair_id}/self/get", response_model=RepairRequestOut_schemas)
 async def take_repair(
     repair_id: int,
     current_user: dict = Depends(require_admin),
     db: AsyncSession = Depends(get_db),
 ):
-    admin_id = int(current_user["sub"])
+    """Взяти заявку в роботу одним умовним UPDATE ... RETURNING.
 
-    stmt = select(RepairRequest).where(RepairRequest.id == repair_id)
-    repair = await db.scalar(stmt)
+    Перевірка і запис атомарні: з кількох майстрів, що одночасно беруть
+    ту саму заявку, рядок отримує лише один, решта отримують 400.
+    """
+    admin_id = int(current_user["sub"])
 
-    if not repair:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, 
-            detail="Repair not found"
-        )
-    
-    # Проверка, не взята ли уже заявка
-    if repair.admin_id:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Заявка вже прийнята іншим майстром"
+    stmt = (
+        update(RepairRequest)
+        .where(
+            RepairRequest.id == repair_id,
+            RepairRequest.admin_id.is_(None),
+            RepairRequest.status == RequestStatus.NEW,
         )
-    
-    # Проверка статуса
-    if repair.status != RequestStatus.NEW:
+        .values(admin_id=admin_id, status=RequestStatus.IN_PROGRESS)
+        .returning(*REPAIR_RETURNING)
+    )
+    row = (await db.execute(stmt)).one_or_none()
+
+    if row is None:
+        # Заявку не взято; з'ясовуємо причину лише на цьому рідкому шляху
+        repair = (
+            await db.execute(
+                select(RepairRequest.admin_id, RepairRequest.status).where(
+                    RepairRequest.id == repair_id
+                )
+            )
+        ).one_or_none()
+        if repair is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Repair not found"
+            )
+        if repair.admin_id:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Заявка вже прийнята іншим майстром"
+            )
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Можна приймати тільки нові заявки"
         )
 
-    repair.admin_id = admin_id
-    repair.status = RequestStatus.IN_PROGRESS
-
+    queue_notification(
+        db,
+        row.user_id,
+        "✅ Вашу заявку прийняли! \nОчікуйте на подальші повідомлення майстра",
+    )
     await db.commit()
-    await db.refresh(repair)
-    
-    try:
-        send_msg(
-            repair.user_id,
-            "✅ Вашу заявку прийняли! \nОчікуйте на подальші повідомлення майстра"
-        )
-    except Exception as e:
-        # Логируем, но не падаем
-        print(f"Telegram error: {e}")
-    
-    return repair
+    await invalidate_repair_lists([row.user_id], [admin_id])
 
+    data = repair_row_dict(row)
+    publish_repair("assign", data)
+    return ORJSONResponse(data)
 
-@router.get("/self/repairs")
+
+@router.get("/self/repairs", response_model=list[RepairRequestOut_schemas])
 async def get_admin_repairs(
-    current_user: dict = Depends(require_admin), db: AsyncSession = Depends(get_db)
+    request: Request,
+    current_user: dict = Depends(require_admin),
+    db: AsyncSession = Depends(get_db),
 ):
     admin_id = int(current_user["sub"])
 
-    stmt = select(RepairRequest).where(RepairRequest.admin_id == admin_id)
-    repairs = await db.scalars(stmt)
-    return repairs.all()
+    async def build():
+        return ORJSONResponse(
+            await list_repairs(db, RepairRequest.admin_id == admin_id)
+        )
+
+    return await repair_lists.respond(request, (f"admin:{admin_id}",), build)
 
 
-@router.put("/repair/{repair_id}/change/status")
+@router.put(
+    "/repair/{repair_id}/change/status", response_model=RepairRequestOut_schemas
+)
 async def change_repair_status(
     repair_id: int,
     new_status: RequestStatus,
     current_user: dict = Depends(require_admin),
     db: AsyncSession = Depends(get_db),
 ):
-    stmt = select(RepairRequest).where(RepairRequest.id == repair_id)
-    repair = await db.scalar(stmt)
+    stmt = (
+        update(RepairRequest)
+        .where(RepairRequest.id == repair_id)
+        .values(status=new_status)
+        .returning(*REPAIR_RETURNING)
+    )
+    row = (await db.execute(stmt)).one_or_none()
 
-    if not repair:
+    if row is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Repair not found"
         )
 
-    repair.status = new_status
-
+    queue_notification(db, row.user_id, "Статус заявки на ремонт змінено!")
     await db.commit()
-    await db.refresh(repair)
-    send_msg(repair.user_id, "Статус заявки на ремонт змінено!")
-    return repair
+    await invalidate_repair_lists([row.user_id], [row.admin_id])
+
+    data = repair_row_dict(row)
+    publish_repair("update", data)
+    return ORJSONResponse(data)
 
 
 @router.post("/repair/{repair_id}/change/comment")
@@ -115,21 +252,196 @@ async def create_comment(
     current_user: dict = Depends(require_admin),
     db: AsyncSession = Depends(get_db),
 ):
+    """Коментар одним INSERT ... SELECT ... RETURNING.
+
+    Якщо заявки немає, SELECT не дає рядка і нічого не вставляється.
+    """
     admin_id = int(current_user["sub"])
 
-    stmt = select(RepairRequest).where(RepairRequest.id == repair_id)
-    repair = await db.scalar(stmt)
+    stmt = (
+        insert(AdminMessage)
+        .from_select(
+            ["message", "request_id", "admin_id"],
+            select(
+                literal(message), RepairRequest.id, literal(admin_id)
+            ).where(RepairRequest.id == repair_id),
+        )
+        .returning(
+            AdminMessage.id,
+            AdminMessage.message,
+            AdminMessage.created_at,
+            AdminMessage.request_id,
+            AdminMessage.admin_id,
+            select(RepairRequest.user_id)
+            .where(RepairRequest.id == repair_id)
+            .scalar_subquery()
+            .label("user_id"),
+        )
+    )
+    row = (await db.execute(stmt)).one_or_none()
 
-    if not repair:
+    if row is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Repair not found"
         )
 
-    new_message = AdminMessage(message=message, request_id=repair_id, admin_id=admin_id)
+    queue_notification(db, row.user_id, "Надійшло нове повідомлення!")
+    await db.commit()
+
+    data = row._asdict()
+    del data["user_id"]
+    return ORJSONResponse(data)
+
 
-    db.add(new_message)
+@router.get("/users/list", response_model=UserPageOut)
+async def get_users(
+    q: str | None = Query(None, max_length=100),
+    cursor: int | None = Query(None),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    current_user: dict = Depends(require_admin),
+    db: AsyncSession = Depends(get_db),
+):
+    """Користувачі з лічильниками заявок; q шукає за початком username або email"""
+    return ORJSONResponse(await list_users(db, q, cursor, limit))
+
+
+@router.get("/stats/pool")
+async def get_pool_stats(current_user: dict = Depends(require_admin)):
+    """Статистика пулу з'єднань БД для підбору DB_POOL_SIZE"""
+    return pool_stats(async_engine)
+
+
+@router.get("/stats/cache")
+async def get_cache_stats(current_user: dict = Depends(require_admin)):
+    """Влучання та промахи кешів для підбору розмірів і TTL"""
+    return {
+        "repair_lists": repair_lists.stats(),
+        "tokens": token_cache.stats(),
+        "identities": identities.stats(),
+        "pages": page_cache.stats(),
+    }
+
+
+@router.get("/stats/status")
+async def get_status_counts(
+    current_user: dict = Depends(require_admin),
+    db: AsyncSession = Depends(get_db),
+):
+    """Лічильники заявок за статусами для карток адмін-панелі"""
+    counts = await load_status_counts(db)
+    return {"status_counts": counts, "total": sum(counts.values())}
+
+
+@router.get("/stats/reports")
+async def get_reports(
+    days: int = Query(DEFAULT_REPORT_DAYS, ge=1, le=366),
+    current_user: dict = Depends(require_admin),
+    db: AsyncSession = Depends(get_db),
+):
+    """Звіти із зведених таблиць: статуси, час виконання, навантаження, надходження"""
+    return ORJSONResponse(await load_report(db, days))
+
+
+@router.get("/events")
+async def repair_events_stream(
+    request: Request, current_user: dict = Depends(require_admin_cookie)
+):
+    """SSE: дельти заявок (create, update, assign, delete) для дашборду"""
+
+    async def stream():
+        with repair_events.subscribe() as queue:
+            yield "retry: 3000\n\n"
+            while not await request.is_disconnected():
+                try:
+                    message = await asyncio.wait_for(queue.get(), timeout=15)
+                except asyncio.TimeoutError:
+                    yield ": ping\n\n"
+                    continue
+                yield format_sse(*message)
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.put("/repairs/bulk/status", response_model=BulkResultOut_schemas)
+async def bulk_change_status(
+    payload: BulkStatusChange_schemas,
+    current_user: dict = Depends(require_admin),
+    db: AsyncSession = Depends(get_db),
+):
+    """Зміна статусу багатьох заявок одним UPDATE ... RETURNING"""
+    stmt = (
+        update(RepairRequest)
+        .where(RepairRequest.id.in_(payload.repair_ids))
+        .values(status=payload.new_status)
+        .returning(
+            RepairRequest.id,
+            RepairRequest.user_id,
+            RepairRequest.admin_id,
+            RepairRequest.status,
+            RepairRequest.updated_at,
+        )
+    )
+    rows = (await db.execute(stmt)).all()
+    await queue_notifications(
+        db, [row.user_id for row in rows], "Статус заявки на ремонт змінено!"
+    )
     await db.commit()
-    await db.refresh(new_message)
-    send_msg(repair.user_id, "Надійшло нове повідомлення!")
-    return new_message
+    await invalidate_repair_lists(
+        [row.user_id for row in rows], [row.admin_id for row in rows]
+    )
+
+    for row in rows:
+        publish_repair("update", row._asdict())
+    return bulk_result(payload.repair_ids, rows)
+
+
+@router.post("/repairs/bulk/self/get", response_model=BulkResultOut_schemas)
+async def bulk_take_repairs(
+    payload: BulkRepairIds_schemas,
+    current_user: dict = Depends(require_admin),
+    db: AsyncSession = Depends(get_db),
+):
+    """Взяти в роботу багато нових заявок; зайняті іншими пропускаються"""
+    admin_id = int(current_user["sub"])
+
+    stmt = (
+        update(RepairRequest)
+        .where(
+            RepairRequest.id.in_(payload.repair_ids),
+            RepairRequest.admin_id.is_(None),
+            RepairRequest.status == RequestStatus.NEW,
+        )
+        .values(admin_id=admin_id, status=RequestStatus.IN_PROGRESS)
+        .returning(
+            RepairRequest.id,
+            RepairRequest.user_id,
+            RepairRequest.admin_id,
+            RepairRequest.status,
+            RepairRequest.updated_at,
+        )
+    )
+    rows = (await db.execute(stmt)).all()
+    await queue_notifications(
+        db,
+        [row.user_id for row in rows],
+        "✅ Вашу заявку прийняли! \nОчікуйте на подальші повідомлення майстра",
+    )
+    await db.commit()
+    await invalidate_repair_lists([row.user_id for row in rows], [admin_id])
+
+    admin = {"id": admin_id, "username": current_user.get("username")}
+    for row in rows:
+        publish_repair("assign", {**row._asdict(), "admin": admin})
+    return bulk_result(payload.repair_ids, rows)
+
 
+def bulk_result(requested: list[int], rows) -> dict:
+    updated = {row.id for row in rows}
+    return {
+        "updated": sorted(updated),
+        "skipped": sorted(set(requested) - updated),
+    }
@@ -1,14 +1,15 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Cookie, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
-from werkzeug.security import generate_password_hash
 
 from models.models import User
 from schemas.user import UserInput, UserOut
 from settings import get_db
 from tools.auth import (authenticate_user, create_access_token,
-                        decode_access_token)
+                        decode_access_token, load_identity)
+from tools.passwords import hash_password
+from tools.ratelimit import login_ip_limit, login_limit, register_limit
 
 router = APIRouter()
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/token")
@@ -35,7 +36,18 @@ def require_admin(user: dict = Depends(get_current_user)):
     return user
 
 
-@router.post("/token")
+def require_admin_cookie(access_token: str | None = Cookie(None)):
+    """Як require_admin, але токен з cookie (EventSource не шле заголовки)"""
+    user = decode_access_token(access_token) if access_token else None
+    if not user:
+        raise credentials_exception
+    return require_admin(user)
+
+
+@router.post(
+    "/token",
+    dependencies=[Depends(login_limit), Depends(login_ip_limit)],
+)
 async def generate_token(form_data: OAuth2PasswordRequestForm = Depends()):
     """Генерація JWT токена для входу"""
     try:
@@ -66,7 +78,9 @@ async def generate_token(form_data: OAuth2PasswordRequestForm = Depends()):
         )
 
 
-@router.post("/register", response_model=UserOut)
+@router.post(
+    "/register", response_model=UserOut, dependencies=[Depends(register_limit)]
+)
 async def register_user(user: UserInput, db: AsyncSession = Depends(get_db)):
     """Реєстрація нового користувача (API endpoint)"""
 
@@ -88,9 +102,12 @@ async def register_user(user: UserInput, db: AsyncSession = Depends(get_db)):
             detail="Користувач з таким іменем вже існує",
         )
 
+    # Перевірки завершено: з'єднання повертається в пул на час хешування
+    await db.rollback()
+
     # Створення нового користувача
     new_user = User(**user.model_dump())
-    new_user.password = generate_password_hash(user.password)
+    new_user.password = await hash_password(user.password)
 
     db.add(new_user)
     await db.commit()
@@ -105,7 +122,7 @@ async def get_current_user_info(
 ):
     """Отримання інформації про поточного користувача"""
     user_id = int(current_user["sub"])
-    user = await db.scalar(select(User).where(User.id == user_id))
+    user = await load_identity(db, user_id)
 
     if not user:
         raise HTTPException(
@@ -1,9 +1,8 @@
 from fastapi import Request
 from fastapi.exceptions import RequestValidationError
-from fastapi.templating import Jinja2Templates
 from starlette.exceptions import HTTPException as StarletteHTTPException
 
-templates = Jinja2Templates(directory="templates")
+from tools.templates import templates
 
 
 async def http_exception_handler(request: Request, exc):
@@ -12,7 +11,10 @@ async def http_exception_handler(request: Request, exc):
         401: ("Не авторизовано", "Увійдіть до системи."),
         403: ("Доступ заборонено", "У вас немає прав для цієї дії."),
         404: ("Сторінку не знайдено", "Сторінка не існує."),
+        413: ("Файл завеликий", "Зменшіть розмір файлу та спробуйте ще раз."),
+        429: ("Забагато запитів", "Зачекайте трохи та спробуйте знову."),
         500: ("Помилка сервера", "Спробуйте пізніше."),
+        503: ("Сервіс перевантажено", "Спробуйте за кілька секунд."),
     }
 
     title, description = error_messages.get(
@@ -28,6 +30,7 @@ async def http_exception_handler(request: Request, exc):
             "error_description": description,
         },
         status_code=exc.status_code,
+        headers=getattr(exc, "headers", None),
     )
 
 
@@ -1,73 +1,64 @@
 # routes/frontend.py - Виправлений файл
 from starlette.responses import HTMLResponse
-from fastapi import (APIRouter, Cookie, Depends, Form, Request, Response)
+from fastapi import (APIRouter, Cookie, Depends, Form, HTTPException, Request,
+                     Response)
 from fastapi.responses import RedirectResponse
-from fastapi.templating import Jinja2Templates
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
-from werkzeug.security import generate_password_hash
 
+from models.loading import REPAIR_WITH_THREAD
 from models.models import RepairRequest, User
 from settings import get_db
-from tools.auth import authenticate_user, create_access_token, decode_access_token
+from tools.auth import (Identity, authenticate_user, create_access_token,
+                        decode_access_token, load_identity)
+from tools.pagination import DEFAULT_PAGE_SIZE
+from tools.passwords import hash_password
+from tools.ratelimit import login_ip_limit, login_limit, register_limit
+from tools.reports import load_report
+from tools.templates import page_cache, templates
+from tools.users import list_users
 
-templates = Jinja2Templates(directory="templates")
 router = APIRouter(include_in_schema=False)
 
 
-# Helper function to get current user from cookie
 async def get_current_user_from_cookie(
-    access_token: str | None = Cookie(None), 
-    db: AsyncSession = Depends(get_db)
-):
-    """Отримати поточного користувача з cookie"""
-    print(f"=== GET USER FROM COOKIE DEBUG ===")
-    print(f"access_token: {access_token}")
-    
-    if not access_token:
-        print("No access_token in cookie!")
+    access_token: str | None = Cookie(None),
+    db: AsyncSession = Depends(get_db),
+) -> Identity | None:
+    """Поточний користувач з cookie; зазвичай з кешу identity, без запиту до БД"""
+    user_data = decode_access_token(access_token)
+    if not user_data:
         return None
-    
+
     try:
-        user_data = decode_access_token(access_token)
-        print(f"user_data from token: {user_data}")
-        
-        if not user_data:
-            print("decode_access_token returned None!")
-            return None
-        
         user_id = int(user_data["sub"])
-        print(f"user_id: {user_id}")
-        
-        user = await db.scalar(select(User).where(User.id == user_id))
-        print(f"user from DB: {user}")
-        print(f"is_admin: {user.is_admin if user else None}")
-        print(f"==================================")
-        
-        return user
-    except Exception as e:
-        print(f"Error getting user from cookie: {e}")
-        import traceback
-        traceback.print_exc()
+    except (KeyError, ValueError):
         return None
+    return await load_identity(db, user_id)
 
 
 @router.get("/")
 async def home(
     request: Request,
     error: str | None = None,
-    current_user: User | None = Depends(get_current_user_from_cookie),
+    current_user: Identity | None = Depends(get_current_user_from_cookie),
 ):
-    """Головна сторінка"""
-    return templates.TemplateResponse(
-        "index.html",
-        {
-            "request": request,
-            "error": error,
-            "current_user": current_user,
-            "is_authenticated": current_user is not None,
-        },
-    )
+    """Головна сторінка; для анонімів віддається з кешу сторінок"""
+
+    def render():
+        return templates.TemplateResponse(
+            "index.html",
+            {
+                "request": request,
+                "error": error,
+                "current_user": current_user,
+                "is_authenticated": current_user is not None,
+            },
+        )
+
+    if current_user is None:
+        return page_cache.render(request, render)
+    return render()
 
 
 # ==================== AUTH PAGES ====================
@@ -94,28 +85,25 @@ async def register_page(request: Request, error: str | None = None):
         {"request": request, "error": error}
     )
 
-@router.post("/auth/token")
+@router.post(
+    "/auth/token",
+    dependencies=[Depends(login_limit), Depends(login_ip_limit)],
+)
 async def login_form(
     request: Request,
     username: str = Form(...),
     password: str = Form(...),
 ):
-    print(f"\n{'='*50}")
-    print(f"LOGIN ATTEMPT: {username}")
-    
     try:
         user = await authenticate_user(username, password)
 
         if not user:
-            print("❌ Authentication FAILED")
             return templates.TemplateResponse(
                 "login.html",
                 {"request": request, "error": "Невірне ім'я користувача або пароль"},
                 status_code=401,
             )
 
-        print(f"✅ User authenticated: {user.username}, is_admin={user.is_admin}")
-
         # Створюємо токен
         data_payload = {
             "sub": str(user.id),
@@ -124,8 +112,6 @@ async def login_form(
             "is_admin": user.is_admin,
         }
         access_token = create_access_token(payload=data_payload)
-        print(f"✅ Token created")
-        print(f"{'='*50}\n")
 
         # Повертаємо HTML з JavaScript для встановлення cookie
         redirect_url = "/admin" if user.is_admin else "/"
@@ -199,6 +185,8 @@ async def login_form(
         from starlette.responses import HTMLResponse
         return HTMLResponse(content=html_content)
 
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"❌ LOGIN ERROR: {e}")
         import traceback
@@ -210,7 +198,7 @@ async def login_form(
             status_code=500,
         )
 
-@router.post("/auth/register")
+@router.post("/auth/register", dependencies=[Depends(register_limit)])
 async def register_form(
     request: Request,
     username: str = Form(...),
@@ -240,9 +228,12 @@ async def register_form(
                 status_code=400,
             )
 
+        # Перевірки завершено: з'єднання повертається в пул на час хешування
+        await db.rollback()
+
         # Створення нового користувача
         new_user = User(username=username, email=email, is_admin=False)
-        new_user.password = generate_password_hash(password)
+        new_user.password = await hash_password(password)
 
         db.add(new_user)
         await db.commit()
@@ -254,6 +245,8 @@ async def register_form(
             status_code=303,
         )
 
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"Registration error: {e}")
         return templates.TemplateResponse(
@@ -277,23 +270,15 @@ async def logout():
 @router.get("/admin")
 async def admin_panel(
     request: Request,
-    current_user: User | None = Depends(get_current_user_from_cookie),
+    current_user: Identity | None = Depends(get_current_user_from_cookie),
 ):
     """Адмін-панель"""
-    # DEBUG
-    print(f"=== ADMIN PANEL DEBUG ===")
-    print(f"Current user: {current_user}")
-    print(f"Is admin: {current_user.is_admin if current_user else 'No user'}")
-    print(f"========================")
-    
     # Якщо користувач не авторизований
     if not current_user:
-        print("Redirecting to login - no user")
         return RedirectResponse(url="/auth/login", status_code=303)
     
     # Якщо користувач не адмін
     if not current_user.is_admin:
-        print("User is not admin")
         return templates.TemplateResponse(
             "error.html",
             {
@@ -306,7 +291,6 @@ async def admin_panel(
         )
     
     # Все OK - показуємо адмін-панель
-    print("Showing admin panel")
     return templates.TemplateResponse(
         "admin.html",
         {
@@ -320,7 +304,7 @@ async def admin_panel(
 async def admin_repair_detail(
     request: Request,
     repair_id: int,
-    current_user: User | None = Depends(get_current_user_from_cookie),
+    current_user: Identity | None = Depends(get_current_user_from_cookie),
     db: AsyncSession = Depends(get_db),
 ):
     """Деталі заявки на ремонт"""
@@ -328,7 +312,9 @@ async def admin_repair_detail(
         return RedirectResponse(url="/auth/login", status_code=303)
     
     repair = await db.scalar(
-        select(RepairRequest).where(RepairRequest.id == repair_id)
+        select(RepairRequest)
+        .options(*REPAIR_WITH_THREAD)
+        .where(RepairRequest.id == repair_id)
     )
     
     if not repair:
@@ -353,13 +339,53 @@ async def admin_repair_detail(
     )
 
 
+@router.get("/admin/reports")
+async def admin_reports(
+    request: Request,
+    current_user: Identity | None = Depends(get_current_user_from_cookie),
+    db: AsyncSession = Depends(get_db),
+):
+    """Звіти для адміністратора"""
+    if not current_user or not current_user.is_admin:
+        return RedirectResponse(url="/auth/login", status_code=303)
+
+    return templates.TemplateResponse(
+        "reports.html",
+        {
+            "request": request,
+            "current_user": current_user,
+            "report": await load_report(db),
+        },
+    )
+
 
+@router.get("/admin/users")
+async def admin_users(
+    request: Request,
+    q: str | None = None,
+    cursor: int | None = None,
+    current_user: Identity | None = Depends(get_current_user_from_cookie),
+    db: AsyncSession = Depends(get_db),
+):
+    """Користувачі для адміністратора, сторінками по 50"""
+    if not current_user or not current_user.is_admin:
+        return RedirectResponse(url="/auth/login", status_code=303)
+
+    return templates.TemplateResponse(
+        "users.html",
+        {
+            "request": request,
+            "current_user": current_user,
+            "q": q or "",
+            "page": await list_users(db, q, cursor, DEFAULT_PAGE_SIZE),
+        },
+    )
 
 
 @router.get("/requests/new")
 async def create_request_page(
     request: Request,
-    current_user: User | None = Depends(get_current_user_from_cookie),
+    current_user: Identity | None = Depends(get_current_user_from_cookie),
 ):
     """Сторінка створення нової заявки"""
     if not current_user:
@@ -376,7 +402,7 @@ async def create_request_page(
 @router.get("/requests")
 async def my_requests_page(
     request: Request,
-    current_user: User | None = Depends(get_current_user_from_cookie),
+    current_user: Identity | None = Depends(get_current_user_from_cookie),
 ):
     """Сторінка моїх заявок"""
     if not current_user:
@@ -395,82 +421,47 @@ async def my_requests_page(
 
 @router.get("/help")
 async def help_page(request: Request):
-    return templates.TemplateResponse(
-        "error.html",
-        {
-            "request": request,
-            "error_code": 501,
-            "error_title": "Не реалізовано",
-            "error_description": "Сторінка допомоги ще в розробці",
-        },
+    return page_cache.render(
+        request,
+        lambda: templates.TemplateResponse(
+            "error.html",
+            {
+                "request": request,
+                "error_code": 501,
+                "error_title": "Не реалізовано",
+                "error_description": "Сторінка допомоги ще в розробці",
+            },
+        ),
     )
 
 
 @router.get("/contacts")
 async def contacts_page(request: Request):
-    return templates.TemplateResponse(
-        "error.html",
-        {
-            "request": request,
-            "error_code": 501,
-            "error_title": "Не реалізовано",
-            "error_description": "Сторінка контактів ще в розробці",
-        },
+    return page_cache.render(
+        request,
+        lambda: templates.TemplateResponse(
+            "error.html",
+            {
+                "request": request,
+                "error_code": 501,
+                "error_title": "Не реалізовано",
+                "error_description": "Сторінка контактів ще в розробці",
+            },
+        ),
     )
 
 
 @router.get("/faq")
 async def faq_page(request: Request):
-    return templates.TemplateResponse(
-        "error.html",
-        {
-            "request": request,
-            "error_code": 501,
-            "error_title": "Не реалізовано",
-            "error_description": "Сторінка FAQ ще в розробці",
-        },
+    return page_cache.render(
+        request,
+        lambda: templates.TemplateResponse(
+            "error.html",
+            {
+                "request": request,
+                "error_code": 501,
+                "error_title": "Не реалізовано",
+                "error_description": "Сторінка FAQ ще в розробці",
+            },
+        ),
     )
-
-
-async def get_current_user_from_cookie(
-    access_token: str | None = Cookie(None), 
-    db: AsyncSession = Depends(get_db)
-):
-    """Отримати поточного користувача з cookie"""
-    print(f"\n{'='*50}")
-    print(f"GET USER FROM COOKIE")
-    print(f"Cookie access_token: {access_token[:30] if access_token else 'None'}...")
-    
-    if not access_token:
-        print("❌ No access_token in cookie!")
-        print(f"{'='*50}\n")
-        return None
-    
-    try:
-        user_data = decode_access_token(access_token)
-        print(f"User data from decode: {user_data}")
-        
-        if not user_data:
-            print("❌ decode_access_token returned None!")
-            print(f"{'='*50}\n")
-            return None
-        
-        user_id = int(user_data["sub"])
-        print(f"Looking for user_id: {user_id}")
-        
-        user = await db.scalar(select(User).where(User.id == user_id))
-        
-        if user:
-            print(f"✅ User found: {user.username}, is_admin={user.is_admin}")
-        else:
-            print(f"❌ User NOT found in database!")
-        
-        print(f"{'='*50}\n")
-        return user
-        
-    except Exception as e:
-        print(f"❌ Error getting user from cookie: {e}")
-        import traceback
-        traceback.print_exc()
-        print(f"{'='*50}\n")
-        return None
\ No newline at end of file
@@ -1,16 +1,24 @@
 from datetime import datetime
-from fastapi import (APIRouter, BackgroundTasks, Cookie, Depends, File, Form,
-                     HTTPException, Request, UploadFile, status)
+from fastapi import (APIRouter, Cookie, Depends, File, Form, HTTPException,
+                     Query, Request, UploadFile, status)
 
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
-from fastapi.responses import RedirectResponse
-from models import RepairRequest, User
+from fastapi.responses import ORJSONResponse, RedirectResponse
+from models import RepairRequest
+from models.loading import (REPAIR_LIST_COLUMNS, REPAIR_WITH_THREAD,
+                            repair_row_dict)
 from routes.auth import get_current_user
+from tools.auth import load_identity
 from schemas.user import UserOut
 from settings import get_db
-from tools.file_upload import generate_file_url, save_file
-from schemas.request import ListMessagesRepairRequestOut_schemas, ListRepairRequestOut_schemas, MessagesRepairRequestOut_schemas, RepairRequestOut_schemas
+from tools.cache import invalidate_repair_lists, repair_lists
+from tools.events import publish_repair, publish_repair_deleted
+from tools.file_upload import save_file
+from tools.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from tools.repairs import list_messages, list_repairs, owned_by_user
+from tools.sync import changed_since, list_version, not_modified, version_headers
+from schemas.request import ListMessagesRepairRequestOut_schemas, ListRepairRequestOut_schemas, MessagesRepairRequestOut_schemas, RepairRequestOut_schemas, RepairRequestSyncOut_schemas
 
 router = APIRouter()
 
@@ -20,16 +28,13 @@ async def user_me_data(
     current_user: dict = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
-    user_id = current_user["sub"]
-    stmt = select(User).where(User.id == int(user_id))
-    user = await db.scalar(stmt)
-    return user
+    return await load_identity(db, int(current_user["sub"]))
 
 
+# Ліміт repair_add_limit перевіряє RateLimitMiddleware до завантаження фото
 @router.post("/repair/add")
 async def create_repair_request(
     request: Request,
-    bgt: BackgroundTasks,
     db: AsyncSession = Depends(get_db),
     description: str = Form(...),
     image: UploadFile | None = File(None),
@@ -50,8 +55,7 @@ async def create_repair_request(
     # Обробка фото
     image_url = None
     if image and image.filename:
-        image_url = await generate_file_url(image.filename)
-        bgt.add_task(save_file, image, image_url)
+        image_url = await save_file(image)
 
     # Обробка дати
     required_time_dt = None
@@ -73,6 +77,13 @@ async def create_repair_request(
     db.add(new_req)
     await db.commit()
     await db.refresh(new_req)
+    await invalidate_repair_lists([user_id])
+    publish_repair(
+        "create",
+        new_req,
+        user={"id": user_id, "username": user_data.get("username")},
+        admin=None,
+    )
     
     return RedirectResponse(
         url="/requests?success=Заявку успішно створено!", 
@@ -80,14 +91,42 @@ async def create_repair_request(
     )
 
 
-@router.get("/repairs")
+@router.get(
+    "/repairs",
+    response_model=list[RepairRequestOut_schemas] | RepairRequestSyncOut_schemas,
+)
 async def get_all_repairs(
-    current_user: dict = Depends(get_current_user), db: AsyncSession = Depends(get_db)
+    request: Request,
+    since: str | None = Query(None),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    current_user: dict = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
 ):
-    repairs = await db.scalars(
-        select(RepairRequest).where(RepairRequest.user_id == int(current_user["sub"]))
+    """Заявки користувача; since=<cursor> — лише змінені, з ETag / 304.
+
+    Зміна, закомічена пізніше, ніж курсор пройшов її updated_at, через
+    since не приходить; повний список (без since) її містить.
+    """
+    conditions = [owned_by_user(int(current_user["sub"]))]
+
+    async def build():
+        etag, sync_cursor = await list_version(db, RepairRequest, conditions, request)
+        if cached := not_modified(request, etag):
+            return cached
+        headers = version_headers(etag, sync_cursor)
+
+        stmt = REPAIR_LIST_COLUMNS.where(*conditions)
+        if since:
+            page = await changed_since(
+                db, stmt, RepairRequest, since, limit, serialize=repair_row_dict
+            )
+            return ORJSONResponse(page, headers=headers)
+
+        return ORJSONResponse(await list_repairs(db, *conditions), headers=headers)
+
+    return await repair_lists.respond(
+        request, (f"user:{current_user['sub']}",), build
     )
-    return repairs.all()
 
 
 @router.get("/repair/{repair_id}")
@@ -96,7 +135,11 @@ async def get_repair_request(
     current_user: dict = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
-    stmt = select(RepairRequest).where(RepairRequest.id == int(repair_id) and RepairRequest.user_id == current_user['sub'])
+    stmt = (
+        select(RepairRequest)
+        .options(*REPAIR_WITH_THREAD)
+        .where(RepairRequest.id == repair_id, owned_by_user(int(current_user["sub"])))
+    )
     repair_request = await db.scalar(stmt)
 
     if not repair_request:
@@ -107,10 +150,27 @@ async def get_repair_request(
     return repair_request
 
 
+@router.get(
+    "/repair/{repair_id}/messages",
+    response_model=list[MessagesRepairRequestOut_schemas],
+)
+async def get_repair_messages(
+    repair_id: int,
+    current_user: dict = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """Повідомлення майстрів по своїй заявці (те саме бачить Telegram-бот)"""
+    messages = await list_messages(db, repair_id, owned_by_user(int(current_user["sub"])))
+    if messages is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Repair request not found"
+        )
+    return ORJSONResponse(messages)
+
+
 @router.put("/repair/{repair_id}")
 async def update_repair_request(
     repair_id: int,
-    bgt: BackgroundTasks,
     current_user: dict = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
     description: str = Form(None),
@@ -131,14 +191,14 @@ async def update_repair_request(
     if description:
         repair.description = description
     if image:
-        image_url = await generate_file_url(image.filename)
-        bgt.add_task(save_file, image, image_url)
-        repair.photo_url = image_url
+        repair.photo_url = await save_file(image)
     if required_time:
         repair.required_time = required_time
 
     await db.commit()
     await db.refresh(repair)
+    await invalidate_repair_lists([repair.user_id], [repair.admin_id])
+    publish_repair("update", repair)
     return repair
 
 
@@ -159,6 +219,9 @@ async def delete_repair_request(
             status_code=status.HTTP_404_NOT_FOUND, detail="Repair request not found"
         )
 
+    user_id, admin_id = repair.user_id, repair.admin_id
     await db.delete(repair)
     await db.commit()
+    await invalidate_repair_lists([user_id], [admin_id])
+    publish_repair_deleted(repair_id)
     return {"message": f"Repair request {repair_id} deleted successfully"}
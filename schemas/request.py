@@ -1,23 +1,64 @@
-from pydantic import BaseModel, ConfigDict, EmailStr
+from pydantic import BaseModel, ConfigDict, EmailStr, Field
 from models import RequestStatus
 from typing import List
 import datetime as dt
 
+
+class UserRefOut_schemas(BaseModel):
+    id: int
+    username: str
+
+
 class RepairRequestOut_schemas(BaseModel):
     id: int
     description: str
-    photo_url: str
+    photo_url: str | None = None
     status: RequestStatus
-    # required_time: dt.datetime
+    required_time: dt.datetime | None = None
+    created_at: dt.datetime
+    updated_at: dt.datetime
+    user_id: int
+    admin_id: int | None = None
+    user: UserRefOut_schemas | None = None
+    admin: UserRefOut_schemas | None = None
+
     class Config:
         from_attributes = True
 
 class ListRepairRequestOut_schemas(BaseModel):
     repairs: List[RepairRequestOut_schemas]
 
+class RepairRequestPageOut_schemas(BaseModel):
+    items: List[RepairRequestOut_schemas]
+    next_cursor: str | None = None
+
+class RepairRequestSyncOut_schemas(BaseModel):
+    items: List[RepairRequestOut_schemas]
+    cursor: str
+    has_more: bool
+
+class RepairRequestSearchHit_schemas(RepairRequestOut_schemas):
+    rank: float
+
+class RepairRequestSearchOut_schemas(BaseModel):
+    items: List[RepairRequestSearchHit_schemas]
+    next_offset: int | None = None
+
+class BulkRepairIds_schemas(BaseModel):
+    repair_ids: List[int] = Field(min_length=1, max_length=1000)
+
+class BulkStatusChange_schemas(BulkRepairIds_schemas):
+    new_status: RequestStatus
+
+class BulkResultOut_schemas(BaseModel):
+    updated: List[int]
+    skipped: List[int]
+
 class MessagesRepairRequestOut_schemas(BaseModel):
     id: int
-    message: List
+    message: str
+    created_at: dt.datetime
+    admin: UserRefOut_schemas | None = None
 
     class Config:
         from_attributes = True
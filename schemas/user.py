@@ -15,3 +15,14 @@ class UserInput(UserBase):
 class UserOut(UserBase):
     id: int
     is_admin: bool = False
+
+
+class UserListItemOut(UserOut):
+    total_repairs: int
+    open_repairs: int
+    telegram_linked: bool
+
+
+class UserPageOut(BaseModel):
+    items: list[UserListItemOut]
+    next_cursor: int | None = None
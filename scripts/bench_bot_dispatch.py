@@ -0,0 +1,137 @@
+"""Тисячі розмов через диспетчер бота: пам'ять, кількість хендлерів, затримка.
+
+    python -m scripts.bench_bot_dispatch --updates 10000 --chats 100
+
+Кожен чат по колу проходить CONVERSATION: /start, невірний код текстом,
+/messages та нечисловий номер заявки, тож звичайний текст приходить
+посеред розмови. Апдейти подаються в dp.feed_update без мережі: сесія бота
+лише рахує виклики Bot API, а коди перевіряються в тимчасовій SQLite базі.
+Для порівняння той самий потік проходить через диспетчер зі старою схемою,
+де кожен /start реєстрував новий @dp.message().
+"""
+
+import argparse
+import asyncio
+import datetime as dt
+import os
+import tempfile
+import time
+import tracemalloc
+
+from aiogram import Bot, Dispatcher, types
+from aiogram.client.session.base import BaseSession
+from aiogram.filters import Command
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+import tg_bot
+from models import Users_in_Telegram
+from settings import Base
+
+CONVERSATION = ("/start", "WRONG1", "/messages", "abc")
+
+
+class CountingSession(BaseSession):
+    """Сесія без мережі: відповідь на кожен метод Bot API - None"""
+
+    def __init__(self):
+        super().__init__()
+        self.calls = 0
+
+    async def make_request(self, bot, method, timeout=None):
+        self.calls += 1
+        return None
+
+    async def stream_content(self, url, headers=None, timeout=30, chunk_size=65536, raise_for_status=True):
+        yield b""
+
+    async def close(self):
+        pass
+
+
+def legacy_dispatcher() -> Dispatcher:
+    """Стара схема: хендлер тексту (перевірка коду) додається всередині /start"""
+    dp = Dispatcher()
+
+    @dp.message(Command("start"))
+    async def start_command(message: types.Message):
+        await message.answer("Введіть код")
+
+        @dp.message()
+        async def get_code(message: types.Message):
+            async with tg_bot.async_session() as session:
+                await session.scalar(
+                    select(Users_in_Telegram).where(
+                        Users_in_Telegram.tg_code == message.text
+                    )
+                )
+            await message.answer("Невірний код")
+
+    return dp
+
+
+def message_update(update_id: int, chat_id: int, text: str) -> types.Update:
+    return types.Update(
+        update_id=update_id,
+        message=types.Message(
+            message_id=update_id,
+            date=dt.datetime.now(dt.timezone.utc),
+            chat=types.Chat(id=chat_id, type="private"),
+            from_user=types.User(id=chat_id, is_bot=False, first_name="user"),
+            text=text,
+        ),
+    )
+
+
+def conversation_update(update_id: int, chats: int) -> types.Update:
+    """Апдейт update_id: наступний крок розмови чату update_id % chats"""
+    chat_id = update_id % chats
+    text = CONVERSATION[(update_id // chats) % len(CONVERSATION)]
+    return message_update(update_id, chat_id, text)
+
+
+async def use_sqlite(path: str):
+    """Підмінити БД бота тимчасовою SQLite зі схемою моделей"""
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    tg_bot.async_session = async_sessionmaker(bind=engine, expire_on_commit=False)
+    return engine
+
+
+async def run(label: str, dp: Dispatcher, updates: int, chats: int, batches: int = 5):
+    bot = Bot(token="1:bench", session=CountingSession())
+    per_batch = updates // batches
+    tracemalloc.start()
+    update_id = 0
+    print(label)
+    for batch in range(batches):
+        started = time.perf_counter()
+        for _ in range(per_batch):
+            update_id += 1
+            await dp.feed_update(bot, conversation_update(update_id, chats))
+        elapsed = time.perf_counter() - started
+        current, _ = tracemalloc.get_traced_memory()
+        print(
+            f"  {update_id:>6} апдейтів: {elapsed * 1e6 / per_batch:7.1f} мкс/апдейт, "
+            f"хендлерів {len(dp.message.handlers):>6}, пам'ять {current / 1024:8.0f} КБ"
+        )
+    tracemalloc.stop()
+
+
+async def main(updates: int, chats: int):
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = await use_sqlite(os.path.join(tmp, "bench.db"))
+        try:
+            await run("FSM (tg_bot.dp)", tg_bot.dp, updates, chats)
+            await run("Стара схема", legacy_dispatcher(), updates, chats)
+        finally:
+            await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--updates", type=int, default=10_000)
+    parser.add_argument("--chats", type=int, default=100)
+    args = parser.parse_args()
+    asyncio.run(main(args.updates, args.chats))
@@ -0,0 +1,140 @@
+"""Гонка за заявку: N адміністраторів одночасно беруть ту саму нову заявку.
+
+Показує, скільки запитів отримали 200 (має бути рівно один), та скільки
+SQL-запитів і commit припадає на одну мутацію адміністратора.
+Працює через ASGI без мережі на тимчасовій SQLite базі або на порожній
+тестовій базі з --database-url (таблиці перестворюються). Якщо заявку
+взяли кілька разів, завершується з кодом 1.
+
+    python -m scripts.bench_claim_race --admins 50
+    python -m scripts.bench_claim_race --database-url postgresql+asyncpg://.../race_test
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+from collections import Counter
+
+import httpx
+from fastapi import FastAPI
+from sqlalchemy import event, insert, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from models import RepairRequest, User
+from routes import admin_panel_router
+from settings import Base, get_db
+from tools.auth import create_access_token
+
+
+def admin_headers(admin_id: int) -> dict:
+    token = create_access_token(
+        {"sub": str(admin_id), "username": f"admin{admin_id}", "is_admin": True}
+    )
+    return {"Authorization": f"Bearer {token}"}
+
+
+async def prepare(engine, admins: int):
+    """Чиста схема: admins + 1 користувачів (останній - автор) і три нові заявки"""
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.execute(
+            insert(User),
+            [
+                {"username": f"admin{i}", "email": f"admin{i}@example.com", "password": "", "is_admin": True}
+                for i in range(1, admins + 2)
+            ],
+        )
+        await conn.execute(
+            insert(RepairRequest),
+            [{"description": f"repair {i}", "user_id": admins + 1} for i in range(3)],
+        )
+
+
+def make_app(session_factory) -> FastAPI:
+    async def override_db():
+        async with session_factory() as session:
+            yield session
+
+    app = FastAPI()
+    app.include_router(admin_panel_router, prefix="/admin")
+    app.dependency_overrides[get_db] = override_db
+    return app
+
+
+async def claim_race(client: httpx.AsyncClient, session_factory, admins: int):
+    """Усі адміністратори одночасно беруть заявку 1: (відповіді, admin_id в БД)"""
+    responses = await asyncio.gather(
+        *[
+            client.post("/admin/repair/1/self/get", headers=admin_headers(i))
+            for i in range(1, admins + 1)
+        ]
+    )
+    async with session_factory() as session:
+        winner = await session.scalar(
+            select(RepairRequest.admin_id).where(RepairRequest.id == 1)
+        )
+    return responses, winner
+
+
+async def run(admins: int, database_url: str) -> bool:
+    engine = create_async_engine(database_url, connect_args={"timeout": 30})
+    session_factory = async_sessionmaker(bind=engine, expire_on_commit=False)
+    await prepare(engine, admins)
+
+    counts = Counter()
+    event.listen(engine.sync_engine, "before_cursor_execute", lambda *a: counts.update(["statements"]))
+    event.listen(engine.sync_engine, "commit", lambda *a: counts.update(["commits"]))
+
+    transport = httpx.ASGITransport(app=make_app(session_factory))
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        responses, winner = await claim_race(client, session_factory, admins)
+        codes = Counter(response.status_code for response in responses)
+        print(f"{admins} адміністраторів: коди {dict(codes)}, в БД admin_id={winner}")
+        ok = codes[200] == 1
+        if not ok:
+            print("ПОМИЛКА: заявку взяли кілька разів")
+
+        # Одна мутація кожного типу, рахуємо звернення до БД
+        mutations = {
+            "take_repair": ("POST", "/admin/repair/2/self/get", {}),
+            "change_repair_status": (
+                "PUT",
+                "/admin/repair/2/change/status",
+                {"params": {"new_status": "Завершено"}},
+            ),
+            "create_comment": (
+                "POST",
+                "/admin/repair/2/change/comment",
+                {"params": {"message": "Готово"}},
+            ),
+        }
+        for name, (method, url, kwargs) in mutations.items():
+            counts.clear()
+            response = await client.request(method, url, headers=admin_headers(1), **kwargs)
+            print(
+                f"{name:<22} {response.status_code}  "
+                f"SQL-запитів: {counts['statements']}, commit: {counts['commits']}"
+            )
+
+    await engine.dispose()
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--admins", type=int, default=50)
+    parser.add_argument("--database-url")
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as tmp:
+        database_url = args.database_url or (
+            f"sqlite+aiosqlite:///{os.path.join(tmp, 'race.db')}"
+        )
+        ok = asyncio.run(run(args.admins, database_url))
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
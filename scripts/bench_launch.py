@@ -0,0 +1,113 @@
+"""Старт та пропускна здатність: python main.py (reload) проти serve.py.
+
+    python -m scripts.bench_launch --workers 4 --seconds 10
+
+Для кожного режиму сервер запускається окремим процесом; міряється час
+до першої відповіді 200 та запити/с на /help (кешована сторінка, тож
+переважно накладні витрати сервера) з кількох процесів-клієнтів.
+Клієнти ділять CPU з сервером: на машині з одним ядром різниця між
+воркерами не видна, лише між event loop / HTTP-парсерами.
+"""
+
+import argparse
+import asyncio
+import multiprocessing
+import os
+import signal
+import statistics
+import subprocess
+import sys
+import time
+
+import httpx
+
+MODES = {
+    "main.py (reload, 1 воркер)": (8001, [sys.executable, "main.py"]),
+    "uvicorn asyncio+h11": (
+        8002,
+        [
+            sys.executable, "-m", "uvicorn", "main:app", "--port", "8002",
+            "--loop", "asyncio", "--http", "h11", "--no-access-log", "--workers",
+        ],
+    ),
+    "serve.py uvloop+httptools": (
+        8003,
+        [sys.executable, "serve.py", "--host", "127.0.0.1", "--port", "8003", "--workers"],
+    ),
+}
+
+
+def wait_ready(url: str, timeout: float = 60) -> float:
+    started = time.perf_counter()
+    while time.perf_counter() - started < timeout:
+        try:
+            if httpx.get(url, timeout=1).status_code == 200:
+                return time.perf_counter() - started
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.02)
+    raise TimeoutError(url)
+
+
+async def load(url: str, concurrency: int, seconds: float) -> list[float]:
+    latencies = []
+    deadline = time.perf_counter() + seconds
+
+    async def worker(client):
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            await client.get(url)
+            latencies.append(time.perf_counter() - started)
+
+    limits = httpx.Limits(max_connections=concurrency)
+    async with httpx.AsyncClient(limits=limits) as client:
+        await asyncio.gather(*(worker(client) for _ in range(concurrency)))
+    return latencies
+
+
+def client_process(args) -> list[float]:
+    return asyncio.run(load(*args))
+
+
+def bench(label: str, port: int, cmd: list[str], args):
+    url = f"http://127.0.0.1:{port}/help"
+    server = subprocess.Popen(
+        cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, start_new_session=True
+    )
+    try:
+        startup = wait_ready(url)
+        with multiprocessing.Pool(args.clients) as pool:
+            results = pool.map(
+                client_process,
+                [(url, args.concurrency, args.seconds)] * args.clients,
+            )
+        latencies = sorted(t for result in results for t in result)
+        rps = len(latencies) / args.seconds
+        p50 = statistics.median(latencies) * 1000
+        p99 = latencies[int(len(latencies) * 0.99)] * 1000
+        print(
+            f"{label}: старт {startup:.2f} с, {rps:.0f} запитів/с, "
+            f"p50 {p50:.1f} мс, p99 {p99:.1f} мс"
+        )
+    finally:
+        os.killpg(server.pid, signal.SIGINT)
+        server.wait(timeout=30)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--clients", type=int, default=max(1, (os.cpu_count() or 1) // 2))
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--seconds", type=float, default=10)
+    args = parser.parse_args()
+
+    for label, (port, cmd) in MODES.items():
+        if cmd[-1] == "--workers":
+            cmd = cmd + [str(args.workers)]
+            label = f"{label}, {args.workers} воркер(ів)"
+        bench(label, port, cmd, args)
+
+
+if __name__ == "__main__":
+    main()
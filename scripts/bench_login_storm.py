@@ -0,0 +1,106 @@
+"""Навантажувальний тест: шторм логінів проти запущеного сервера.
+
+Паралельно з логінами на POST /auth/token опитує сторінку, яка не
+торкається хешування (GET /auth/login), і виводить пропускну здатність
+логінів та p50/p99 затримки цієї сторінки. Запуск на різних версіях
+сервера (або з різним HASH_EXECUTOR) дає порівняння.
+
+Сервер запускається без обмеження частоти, інакше майже всі логіни
+отримають 429 і хешування не навантажиться:
+
+    RATE_LIMIT_BACKEND=none python main.py
+    python -m scripts.bench_login_storm --url http://localhost:8001 --logins 20
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+import httpx
+
+
+def percentile(values: list[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+
+async def login_worker(client, stop, counters, username, password):
+    while not stop.is_set():
+        response = await client.post(
+            "/auth/token", data={"username": username, "password": password}
+        )
+        counters[response.status_code] = counters.get(response.status_code, 0) + 1
+
+
+async def probe_worker(client, stop, latencies, path):
+    while not stop.is_set():
+        started = time.perf_counter()
+        await client.get(path)
+        latencies.append((time.perf_counter() - started) * 1000)
+        await asyncio.sleep(0.01)
+
+
+async def run(args):
+    stop = asyncio.Event()
+    counters: dict[int, int] = {}
+    latencies: list[float] = []
+    limits = httpx.Limits(max_connections=args.logins + args.probes)
+
+    async with httpx.AsyncClient(
+        base_url=args.url, limits=limits, timeout=60
+    ) as client:
+        baseline: list[float] = []
+        baseline_stop = asyncio.Event()
+        probe = asyncio.create_task(
+            probe_worker(client, baseline_stop, baseline, args.probe_path)
+        )
+        await asyncio.sleep(args.warmup)
+        baseline_stop.set()
+        await probe
+
+        tasks = [
+            asyncio.create_task(
+                login_worker(client, stop, counters, args.username, args.password)
+            )
+            for _ in range(args.logins)
+        ]
+        tasks += [
+            asyncio.create_task(probe_worker(client, stop, latencies, args.probe_path))
+            for _ in range(args.probes)
+        ]
+        await asyncio.sleep(args.duration)
+        stop.set()
+        await asyncio.gather(*tasks)
+
+    logins_ok = counters.get(200, 0)
+    print(f"логіни: {logins_ok / args.duration:.1f}/с успішних, коди {counters}")
+    if counters.get(429):
+        print("увага: сервер обмежує логіни (429), запустіть його з RATE_LIMIT_BACKEND=none")
+    print(
+        f"{args.probe_path} без навантаження: "
+        f"p50={statistics.median(baseline or [0]):.1f}мс p99={percentile(baseline, 99):.1f}мс"
+    )
+    print(
+        f"{args.probe_path} під штормом:      "
+        f"p50={statistics.median(latencies or [0]):.1f}мс p99={percentile(latencies, 99):.1f}мс"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", default="http://localhost:8001")
+    parser.add_argument("--username", default="admin")
+    parser.add_argument("--password", default="admin")
+    parser.add_argument("--logins", type=int, default=20, help="паралельних логінів")
+    parser.add_argument("--probes", type=int, default=2)
+    parser.add_argument("--probe-path", default="/auth/login")
+    parser.add_argument("--duration", type=float, default=10)
+    parser.add_argument("--warmup", type=float, default=2)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
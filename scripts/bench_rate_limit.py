@@ -0,0 +1,43 @@
+"""Ціна перевірки ліміту на запит: відра в пам'яті та через Redis-бекенд.
+
+    python -m scripts.bench_rate_limit --checks 100000
+
+Redis-бекенд тут працює на InMemoryRedis, тож показує накладні витрати
+самого коду без мережі; з реальним Redis додається один round trip.
+"""
+
+import argparse
+import asyncio
+import time
+from types import SimpleNamespace
+
+from tools import ratelimit
+from tools.cache import InMemoryRedis
+
+
+async def bench(label: str, checks: int, keys: int):
+    limit = ratelimit.RateLimit("bench", f"{checks}/1")
+    requests = [
+        SimpleNamespace(client=SimpleNamespace(host=f"10.0.{i // 256}.{i % 256}"))
+        for i in range(keys)
+    ]
+    start = time.perf_counter()
+    for i in range(checks):
+        await limit(requests[i % keys])
+    elapsed = time.perf_counter() - start
+    print(f"{label}: {elapsed * 1e6 / checks:.2f} мкс/перевірку ({keys} IP)")
+
+
+async def main(checks: int, keys: int):
+    ratelimit.buckets = ratelimit.MemoryBuckets(keys)
+    await bench("memory", checks, keys)
+    ratelimit.buckets = ratelimit.RedisBuckets(InMemoryRedis())
+    await bench("redis (InMemoryRedis)", checks, keys)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--checks", type=int, default=100_000)
+    parser.add_argument("--keys", type=int, default=1000)
+    args = parser.parse_args()
+    asyncio.run(main(args.checks, args.keys))
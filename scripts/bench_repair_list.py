@@ -0,0 +1,129 @@
+"""Порівняння серіалізації списку заявок: ORM + jsonable_encoder проти
+проєкції колонок + orjson (як у /admin/repairs).
+
+Працює на тимчасовій SQLite базі, Postgres не потрібен.
+
+    python -m scripts.bench_repair_list --rows 10000
+"""
+
+import argparse
+import asyncio
+import datetime as dt
+import json
+import os
+import statistics
+import tempfile
+import time
+import tracemalloc
+
+import orjson
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import joinedload
+
+from models import RepairRequest, RequestStatus, User
+from models.loading import REPAIR_LIST_COLUMNS, repair_row_dict
+from settings import Base
+
+# Колишній ORM-шлях списку: об'єкти заявок з автором та майстром
+REPAIR_LIST_ROW = (
+    joinedload(RepairRequest.user, innerjoin=True).load_only(User.id, User.username),
+    joinedload(RepairRequest.admin).load_only(User.id, User.username),
+)
+
+
+async def seed(engine, rows: int):
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.execute(
+            insert(User),
+            [
+                {"username": f"user{i}", "email": f"user{i}@example.com", "password": "", "is_admin": i <= 10}
+                for i in range(1, 1001)
+            ],
+        )
+        now = dt.datetime.now()
+        statuses = list(RequestStatus)
+        await conn.execute(
+            insert(RepairRequest),
+            [
+                {
+                    "description": f"Не вмикається пристрій №{i}, потрібна діагностика",
+                    "status": statuses[i % len(statuses)],
+                    "created_at": now - dt.timedelta(minutes=i),
+                    "updated_at": now,
+                    "user_id": 11 + i % 990,
+                    "admin_id": None if i % 5 == 0 else 1 + i % 10,
+                }
+                for i in range(rows)
+            ],
+        )
+
+
+async def orm_path(session_factory, rows: int) -> bytes:
+    async with session_factory() as session:
+        stmt = (
+            select(RepairRequest)
+            .options(*REPAIR_LIST_ROW)
+            .order_by(RepairRequest.created_at.desc(), RepairRequest.id.desc())
+            .limit(rows)
+        )
+        repairs = (await session.scalars(stmt)).all()
+        return json.dumps(jsonable_encoder(repairs), ensure_ascii=False).encode()
+
+
+async def projection_path(session_factory, rows: int) -> bytes:
+    async with session_factory() as session:
+        stmt = REPAIR_LIST_COLUMNS.order_by(
+            RepairRequest.created_at.desc(), RepairRequest.id.desc()
+        ).limit(rows)
+        result = (await session.execute(stmt)).all()
+        return orjson.dumps([repair_row_dict(row) for row in result])
+
+
+async def measure(name, func, session_factory, rows, repeat):
+    await func(session_factory, rows)  # прогрів
+
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        body = await func(session_factory, rows)
+        timings.append((time.perf_counter() - started) * 1000)
+
+    tracemalloc.start()
+    await func(session_factory, rows)
+    snapshot = tracemalloc.take_snapshot()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    blocks = sum(stat.count for stat in snapshot.statistics("filename"))
+
+    print(
+        f"{name:<12} {statistics.median(timings):8.1f} мс  {len(body) / 1024:8.0f} КБ  "
+        f"пік {peak / 1024 / 1024:6.1f} МБ  блоків {blocks}"
+    )
+
+
+async def run(rows: int, repeat: int):
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_async_engine(f"sqlite+aiosqlite:///{os.path.join(tmp, 'bench.db')}")
+        session_factory = async_sessionmaker(bind=engine, expire_on_commit=False)
+        await seed(engine, rows)
+
+        print(f"{rows} рядків, медіана з {repeat} запусків")
+        print(f"{'шлях':<12} {'час':>11}  {'розмір':>11}  {'пам’ять':>12}")
+        await measure("orm", orm_path, session_factory, rows, repeat)
+        await measure("projection", projection_path, session_factory, rows, repeat)
+        await engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    asyncio.run(run(args.rows, args.repeat))
+
+
+if __name__ == "__main__":
+    main()
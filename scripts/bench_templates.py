@@ -0,0 +1,78 @@
+"""Холодний старт та рендер шаблонів: без кешу байткоду, з ним, та кеш сторінок.
+
+    python -m scripts.bench_templates --renders 2000
+"""
+
+import argparse
+import asyncio
+import tempfile
+import time
+from types import SimpleNamespace
+
+import httpx
+from fastapi import FastAPI
+
+import routes.frontend as frontend
+from tools.templates import PageCache, make_environment, precompile_templates
+
+
+def timed(fn, repeat: int = 1) -> float:
+    """Середній час виклику, мс"""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) * 1000 / repeat
+
+
+def bench_startup():
+    with tempfile.TemporaryDirectory() as cache_dir:
+        cold = timed(lambda: precompile_templates(make_environment(cache_dir=None)))
+        # Перший запуск записує байткод, наступні воркери його лише читають
+        precompile_templates(make_environment(cache_dir=cache_dir))
+        warm = timed(lambda: precompile_templates(make_environment(cache_dir=cache_dir)))
+    print(f"Компіляція всіх шаблонів: без кешу {cold:.1f} мс, з кешем байткоду {warm:.1f} мс")
+
+
+def bench_render(renders: int):
+    context = {
+        "request": None,
+        "current_user": SimpleNamespace(username="admin", email="admin@ex.com", is_admin=True),
+    }
+    for auto_reload in (True, False):
+        env = make_environment(cache_dir=None, auto_reload=auto_reload)
+        precompile_templates(env)
+
+        def render():
+            env.get_template("admin.html").render(context)
+
+        print(f"admin.html, auto_reload={auto_reload}: {timed(render, renders):.3f} мс/рендер")
+
+
+async def bench_page_cache(renders: int):
+    app = FastAPI()
+    app.include_router(frontend.router)
+    transport = httpx.ASGITransport(app=app)
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        for label, cache in (("без кешу", PageCache(0)), ("з кешем", PageCache(16))):
+            frontend.page_cache = cache
+            await client.get("/help")
+            start = time.perf_counter()
+            for _ in range(renders):
+                await client.get("/help")
+            elapsed = (time.perf_counter() - start) * 1000 / renders
+            print(f"GET /help {label}: {elapsed:.3f} мс/запит, {cache.stats()}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--renders", type=int, default=2000)
+    args = parser.parse_args()
+
+    bench_startup()
+    bench_render(args.renders)
+    asyncio.run(bench_page_cache(args.renders))
+
+
+if __name__ == "__main__":
+    main()
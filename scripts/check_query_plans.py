@@ -0,0 +1,209 @@
+"""Перевірка планів запитів застосунку на великому наборі даних.
+
+Створює схему plan_check у базі з settings, наповнює її даними, виконує
+EXPLAIN для кожного запиту з роутів і завершується з кодом 1, якщо хоч
+один з них читає таблицю через Seq Scan. Все виконується в одній
+транзакції, яка в кінці відкочується, тож основна схема не змінюється.
+
+    python -m scripts.check_query_plans --repairs 500000
+"""
+
+import argparse
+import asyncio
+import datetime as dt
+import json
+import sys
+
+from sqlalchemy import select, text, tuple_
+from sqlalchemy.dialects import postgresql
+
+from models import AdminMessage, RepairRequest, RequestStatus, User, Users_in_Telegram
+from models.loading import REPAIR_LIST_COLUMNS, REPAIR_WITH_THREAD
+from settings import Base, async_engine
+from tools.auth import IDENTITY_COLUMNS
+from tools.pagination import DEFAULT_PAGE_SIZE
+from tools.repairs import (messages_query, owned_by_telegram, owned_by_user,
+                           repairs_query)
+from tools.reports import TOTAL_REPAIRS
+from tools.search import ranked_matches
+from tools.sync import version_query
+from tools.users import USER_LIST_COLUMNS, user_search_condition
+
+SCHEMA = "plan_check"
+
+# Зведені таблиці мають рядок на статус / годину / майстра: Seq Scan тут дешевший за індекс
+SMALL_TABLES = {"report_status_counts"}
+
+SEED_SQL = [
+    """
+    INSERT INTO users (username, email, password, is_admin)
+    SELECT 'user' || g, 'user' || g || '@example.com', '', g <= :admins
+    FROM generate_series(1, :users) g
+    """,
+    """
+    INSERT INTO repair_requests (description, status, created_at, updated_at, user_id, admin_id)
+    SELECT 'repair ' || g,
+           (CASE g % 50
+                WHEN 0 THEN 'NEW'
+                WHEN 1 THEN 'IN_PROGRESS'
+                WHEN 2 THEN 'CANCELLED'
+                ELSE 'COMPLETED'
+            END)::request_status,
+           now() - g * interval '1 minute',
+           now(),
+           1 + g % :users,
+           CASE WHEN g % 50 = 0 THEN NULL ELSE 1 + g % :admins END
+    FROM generate_series(1, :repairs) g
+    """,
+    """
+    INSERT INTO admin_messages (message, created_at, request_id, admin_id)
+    SELECT 'message ' || g, now(), 1 + g % :repairs, 1 + g % :admins
+    FROM generate_series(1, :messages) g
+    """,
+    """
+    INSERT INTO users_in_telegram (tg_code, user_tg_id, user_in_site)
+    SELECT upper(substr(md5(g::text), 1, 6)), g::text, g
+    FROM generate_series(1, :users) g
+    """,
+]
+
+
+def app_queries() -> dict:
+    """Запити у тій формі, в якій їх виконують роути"""
+    page = DEFAULT_PAGE_SIZE + 1
+    newest = (RepairRequest.created_at.desc(), RepairRequest.id.desc())
+    cursor = tuple_(RepairRequest.created_at, RepairRequest.id) < tuple_(
+        dt.datetime.now() - dt.timedelta(days=30), 1
+    )
+    since = tuple_(RepairRequest.updated_at, RepairRequest.id) > tuple_(
+        dt.datetime.now() - dt.timedelta(minutes=5), 0
+    )
+    repairs = REPAIR_LIST_COLUMNS
+    ranked = ranked_matches("postgresql", "4242")
+
+    return {
+        "admin repairs: first page": repairs.order_by(*newest).limit(page),
+        "admin repairs: next page": repairs.where(cursor).order_by(*newest).limit(page),
+        "admin repairs: status=NEW": repairs.where(
+            RepairRequest.status == RequestStatus.NEW
+        )
+        .order_by(*newest)
+        .limit(page),
+        "admin repairs: by user": repairs.where(RepairRequest.user_id == 42)
+        .order_by(*newest)
+        .limit(page),
+        "admin self repairs": repairs_query(RepairRequest.admin_id == 7),
+        "account repairs": repairs_query(owned_by_user(42)),
+        "bot repairs": repairs_query(owned_by_telegram(4242)),
+        "admin repairs: since": repairs.where(since)
+        .order_by(RepairRequest.updated_at, RepairRequest.id)
+        .limit(page),
+        "account repairs: since": repairs.where(RepairRequest.user_id == 42, since)
+        .order_by(RepairRequest.updated_at, RepairRequest.id)
+        .limit(page),
+        "account repairs: etag": version_query(RepairRequest, [owned_by_user(42)]),
+        "admin repairs: etag": version_query(RepairRequest, [], TOTAL_REPAIRS),
+        "admin repairs: etag status=NEW": version_query(
+            RepairRequest, [RepairRequest.status == RequestStatus.NEW]
+        ),
+        "admin repairs: search": REPAIR_LIST_COLUMNS.add_columns(ranked.c.rank)
+        .join(ranked, ranked.c.repair_id == RepairRequest.id)
+        .order_by(ranked.c.rank.desc(), RepairRequest.id.desc())
+        .limit(page),
+        "repair detail": select(RepairRequest)
+        .options(*REPAIR_WITH_THREAD)
+        .where(RepairRequest.id == 1000),
+        "repair thread messages": select(AdminMessage).where(
+            AdminMessage.request_id.in_([1000])
+        ),
+        "account repair messages": messages_query(1000, owned_by_user(42)),
+        "bot repair messages": messages_query(1000, owned_by_telegram(4242)),
+        "admin users: first page": USER_LIST_COLUMNS.order_by(User.id).limit(page),
+        "admin users: next page": USER_LIST_COLUMNS.where(User.id > 50000)
+        .order_by(User.id)
+        .limit(page),
+        "admin users: search": USER_LIST_COLUMNS.where(user_search_condition("user4242"))
+        .order_by(User.id)
+        .limit(page),
+        "login by username": select(User).where(User.username == "user4242"),
+        "register: email taken": select(User).where(
+            User.email == "user4242@example.com"
+        ),
+        "current user": IDENTITY_COLUMNS.where(User.id == 4242),
+        "tg link by site user": select(Users_in_Telegram).filter_by(user_in_site=4242),
+        "tg link by code": select(Users_in_Telegram).where(
+            Users_in_Telegram.tg_code == "ABC123"
+        ),
+    }
+
+
+def seq_scans(plan: dict) -> list[str]:
+    """Таблиці, які план читає послідовно"""
+    found = []
+    if plan.get("Node Type") == "Seq Scan" and plan["Relation Name"] not in SMALL_TABLES:
+        found.append(plan["Relation Name"])
+    for child in plan.get("Plans", []):
+        found.extend(seq_scans(child))
+    return found
+
+
+async def check(users: int, admins: int, repairs: int, messages: int) -> int:
+    dialect = postgresql.dialect()
+    failed = 0
+
+    async with async_engine.connect() as conn:
+        await conn.begin()
+        try:
+            await conn.execute(text(f"CREATE SCHEMA {SCHEMA}"))
+            await conn.execute(text(f"SET LOCAL search_path TO {SCHEMA}"))
+            await conn.run_sync(Base.metadata.create_all)
+
+            params = {
+                "users": users,
+                "admins": admins,
+                "repairs": repairs,
+                "messages": messages,
+            }
+            for sql in SEED_SQL:
+                await conn.execute(text(sql), params)
+            await conn.execute(text("ANALYZE"))
+
+            for name, stmt in app_queries().items():
+                sql = str(
+                    stmt.compile(dialect=dialect, compile_kwargs={"literal_binds": True})
+                )
+                result = await conn.execute(text(f"EXPLAIN (FORMAT JSON) {sql}"))
+                plan = result.scalar_one()
+                if isinstance(plan, str):
+                    plan = json.loads(plan)
+                tables = seq_scans(plan[0]["Plan"])
+
+                if tables:
+                    failed += 1
+                    print(f"FAIL  {name}: Seq Scan on {', '.join(tables)}")
+                else:
+                    print(f"ok    {name}")
+        finally:
+            await conn.rollback()
+
+    await async_engine.dispose()
+    return failed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=50_000)
+    parser.add_argument("--admins", type=int, default=50)
+    parser.add_argument("--repairs", type=int, default=500_000)
+    parser.add_argument("--messages", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    failed = asyncio.run(check(args.users, args.admins, args.repairs, args.messages))
+    if failed:
+        print(f"\n{failed} запит(ів) без індексу")
+        sys.exit(1)
+    print("\nУсі запити використовують індекси")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""Локальний фейковий Telegram Bot API для перевірки доставки сповіщень.
+
+Приймає sendMessage та відповідає як Telegram; з --throttle-every N
+кожен N-й запит отримує 429 з retry_after. Статистика: GET /stats.
+
+    python -m scripts.fake_bot_api --port 8081
+    TELEGRAM_API_URL=http://localhost:8081 python -m tg_bot
+"""
+
+import argparse
+import time
+
+from aiohttp import web
+
+stats = {"sendMessage": 0, "throttled": 0, "chats": {}}
+
+
+def ok(result):
+    return web.json_response({"ok": True, "result": result})
+
+
+async def handle(request: web.Request):
+    method = request.match_info["method"]
+    data = dict(await request.post()) if request.can_read_body else {}
+    if request.content_type == "application/json":
+        data = await request.json()
+
+    if method == "getMe":
+        return ok({"id": 1, "is_bot": True, "first_name": "fake", "username": "fake_bot"})
+    if method == "getUpdates":
+        return ok([])
+    if method in ("deleteWebhook", "close", "logOut"):
+        return ok(True)
+    if method != "sendMessage":
+        return ok(True)
+
+    throttle_every = request.app["throttle_every"]
+    calls = stats["sendMessage"] + stats["throttled"] + 1
+    if throttle_every and calls % throttle_every == 0:
+        stats["throttled"] += 1
+        return web.json_response(
+            {
+                "ok": False,
+                "error_code": 429,
+                "description": "Too Many Requests: retry after 1",
+                "parameters": {"retry_after": 1},
+            },
+            status=429,
+        )
+
+    stats["sendMessage"] += 1
+    chat_id = str(data.get("chat_id"))
+    stats["chats"][chat_id] = stats["chats"].get(chat_id, 0) + 1
+    return ok(
+        {
+            "message_id": stats["sendMessage"],
+            "date": int(time.time()),
+            "chat": {"id": int(chat_id), "type": "private"},
+            "text": data.get("text", ""),
+        }
+    )
+
+
+async def get_stats(request: web.Request):
+    return web.json_response(stats)
+
+
+def make_app(throttle_every: int = 0) -> web.Application:
+    app = web.Application()
+    app["throttle_every"] = throttle_every
+    app.router.add_get("/stats", get_stats)
+    app.router.add_route("*", "/bot{token}/{method}", handle)
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--port", type=int, default=8081)
+    parser.add_argument("--throttle-every", type=int, default=0)
+    args = parser.parse_args()
+    web.run_app(make_app(args.throttle_every), port=args.port)
+
+
+if __name__ == "__main__":
+    main()
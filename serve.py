@@ -0,0 +1,64 @@
+"""Продакшн-запуск API: кілька воркерів, uvloop та httptools, без reload.
+
+    python serve.py --workers 4
+
+Кожен воркер прогріває свій пул, тож з'єднань з БД до
+workers * (DB_POOL_SIZE + DB_MAX_OVERFLOW). Кеш списків з CACHE_BACKEND=memory
+та події /admin/events з EVENTS_BACKEND=memory живуть у межах воркера: з
+кількома воркерами потрібні CACHE_BACKEND=redis (або none) та
+EVENTS_BACKEND=redis, інакше адмін-панель бачить через SSE лише зміни, що
+пройшли через її воркер. Telegram-бот запускається окремо: python -m tg_bot.
+"""
+
+import argparse
+import importlib.util
+import logging
+
+import uvicorn
+
+from settings import api_config
+
+logger = logging.getLogger(__name__)
+
+
+def available(module: str, name: str, fallback: str) -> str:
+    # uvloop немає під Windows; тоді стандартні asyncio та h11
+    return name if importlib.util.find_spec(module) else fallback
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--host", default=api_config.WEB_HOST)
+    parser.add_argument("--port", type=int, default=api_config.WEB_PORT)
+    parser.add_argument("--workers", type=int, default=api_config.WEB_WORKERS)
+    args = parser.parse_args()
+
+    if args.workers > 1 and api_config.CACHE_BACKEND == "memory":
+        logger.warning(
+            "CACHE_BACKEND=memory with %d workers: each worker caches lists "
+            "separately and serves stale pages after writes made by the others; "
+            "use CACHE_BACKEND=redis",
+            args.workers,
+        )
+    if args.workers > 1 and api_config.EVENTS_BACKEND == "memory":
+        logger.warning(
+            "EVENTS_BACKEND=memory with %d workers: /admin/events only streams "
+            "changes made through the same worker; use EVENTS_BACKEND=redis",
+            args.workers,
+        )
+
+    uvicorn.run(
+        "main:app",
+        host=args.host,
+        port=args.port,
+        workers=args.workers,
+        loop=available("uvloop", "uvloop", "asyncio"),
+        http=available("httptools", "httptools", "h11"),
+        lifespan="on",
+        access_log=False,
+        timeout_graceful_shutdown=30,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,35 @@
+"""Розмови з ботом не реєструють нових хендлерів."""
+
+import asyncio
+import os
+
+os.environ.setdefault("TOKEN_BOT", "1:test")
+
+from aiogram import Bot
+
+import tg_bot
+from scripts.bench_bot_dispatch import (CONVERSATION, CountingSession,
+                                        conversation_update, use_sqlite)
+
+
+def test_handler_count_constant_across_conversations(tmp_path):
+    chats = 10
+    updates = chats * len(CONVERSATION) * 3
+
+    async def run():
+        original_session = tg_bot.async_session
+        engine = await use_sqlite(str(tmp_path / "bot.db"))
+        session = CountingSession()
+        bot = Bot(token="1:test", session=session)
+        handlers = len(tg_bot.dp.message.handlers)
+        try:
+            for update_id in range(updates):
+                await tg_bot.dp.feed_update(bot, conversation_update(update_id, chats))
+                assert len(tg_bot.dp.message.handlers) == handlers
+        finally:
+            tg_bot.async_session = original_session
+            await engine.dispose()
+        return session.calls
+
+    # Кожен апдейт, включно з текстом посеред розмови, отримує одну відповідь
+    assert asyncio.run(run()) == updates
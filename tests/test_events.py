@@ -0,0 +1,36 @@
+"""Події Redis-шини доходять до підписників SSE усіх воркерів."""
+
+import asyncio
+import os
+
+os.environ.setdefault("TOKEN_BOT", "1:test")
+
+from tools.cache import InMemoryRedis
+from tools.events import RedisEventBus
+
+
+def test_redis_bus_delivers_to_every_worker():
+    async def run():
+        # Дві шини на одному "сервері" Redis - як два воркери uvicorn
+        redis = InMemoryRedis()
+        workers = [RedisEventBus(redis), RedisEventBus(redis)]
+        for bus in workers:
+            await bus.start()
+        await asyncio.sleep(0)
+        try:
+            with workers[0].subscribe() as first, workers[1].subscribe() as second:
+                workers[1].publish("repair", {"type": "update", "repair": {"id": 1}})
+                workers[1].publish("repair", {"type": "delete", "repair": {"id": 2}})
+                return [
+                    [await asyncio.wait_for(queue.get(), 1) for _ in range(2)]
+                    for queue in (first, second)
+                ]
+        finally:
+            for bus in workers:
+                await bus.stop()
+
+    for received in asyncio.run(run()):
+        assert [(event, data["type"]) for _, event, data in received] == [
+            ("repair", "update"),
+            ("repair", "delete"),
+        ]
@@ -0,0 +1,98 @@
+"""Outbox доставляє кожне сповіщення рівно один раз, також після 429."""
+
+import asyncio
+import os
+
+os.environ.setdefault("TOKEN_BOT", "1:test")
+
+from aiogram import Bot
+from aiogram.client.session.aiohttp import AiohttpSession
+from aiogram.client.telegram import TelegramAPIServer
+from aiohttp.test_utils import TestServer
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from models import NotificationOutbox, User, Users_in_Telegram
+from scripts import fake_bot_api
+from settings import Base
+from tools.notifications import OutboxDispatcher
+
+
+def test_each_outbox_row_delivered_once(tmp_path):
+    users = 5
+    per_user = 4
+
+    async def run():
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'outbox.db'}")
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        session_factory = async_sessionmaker(bind=engine, expire_on_commit=False)
+
+        async with session_factory() as session:
+            for user_id in range(1, users + 1):
+                session.add(
+                    User(id=user_id, username=f"u{user_id}", email=f"u{user_id}@x", password="-")
+                )
+                session.add(
+                    Users_in_Telegram(
+                        tg_code=f"C{user_id}",
+                        user_tg_id=str(1000 + user_id),
+                        user_in_site=user_id,
+                    )
+                )
+                for number in range(per_user):
+                    session.add(
+                        NotificationOutbox(user_id=user_id, message=f"{user_id}:{number}")
+                    )
+            # Друга прив'язка того самого користувача: лише найновіша отримує
+            session.add(Users_in_Telegram(tg_code="C1b", user_tg_id="2001", user_in_site=1))
+            await session.commit()
+
+        fake_bot_api.stats.update(sendMessage=0, throttled=0, chats={})
+        server = TestServer(fake_bot_api.make_app(throttle_every=3))
+        await server.start_server()
+        api = TelegramAPIServer.from_base(str(server.make_url("")))
+        bot = Bot(token="1:test", session=AiohttpSession(api=api))
+
+        async def send(chat_id, text):
+            await bot.send_message(chat_id=chat_id, text=text)
+
+        dispatcher = OutboxDispatcher(
+            send,
+            session_factory=session_factory,
+            batch_size=50,
+            max_attempts=10,
+            global_rate=1000,
+            chat_interval=0,
+        )
+        try:
+            for _ in range(20):
+                await dispatcher.drain_once()
+                async with session_factory() as session:
+                    pending = await session.scalar(
+                        select(NotificationOutbox.id).where(
+                            NotificationOutbox.sent_at.is_(None)
+                        )
+                    )
+                if pending is None:
+                    break
+                await asyncio.sleep(1.1)
+
+            async with session_factory() as session:
+                rows = (await session.execute(select(NotificationOutbox))).scalars().all()
+        finally:
+            await bot.session.close()
+            await server.close()
+            await engine.dispose()
+        return rows
+
+    rows = asyncio.run(run())
+
+    assert all(row.sent_at is not None and row.last_error is None for row in rows)
+    stats = fake_bot_api.stats
+    assert stats["throttled"] > 0
+    assert stats["sendMessage"] == users * per_user
+    assert stats["chats"] == {
+        **{str(1000 + user_id): per_user for user_id in range(2, users + 1)},
+        "2001": per_user,
+    }
@@ -0,0 +1,53 @@
+"""Одночасні take_repair: заявку отримує рівно один адміністратор.
+
+Postgres перевіряється, якщо задано TEST_DATABASE_URL (порожня тестова база,
+таблиці перестворюються), наприклад postgresql+asyncpg://postgres@localhost/race_test.
+"""
+
+import asyncio
+import os
+
+os.environ.setdefault("TOKEN_BOT", "1:test")
+
+import httpx
+import pytest
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from scripts.bench_claim_race import claim_race, make_app, prepare
+from settings import api_config
+
+ADMINS = 30
+
+
+@pytest.fixture(params=["sqlite", "postgresql"])
+def database_url(request, tmp_path):
+    if request.param == "sqlite":
+        return f"sqlite+aiosqlite:///{tmp_path / 'race.db'}"
+    url = os.getenv("TEST_DATABASE_URL")
+    if not url:
+        pytest.skip("TEST_DATABASE_URL не задано")
+    return url
+
+
+def test_concurrent_claims_have_one_winner(database_url, monkeypatch):
+    # settings могли імпортувати інші тести, тож ключ задається в конфігурації
+    monkeypatch.setattr(api_config, "SECRET_KEY", "test-secret-key-which-is-long-enough")
+
+    async def run():
+        engine = create_async_engine(database_url)
+        session_factory = async_sessionmaker(bind=engine, expire_on_commit=False)
+        try:
+            await prepare(engine, ADMINS)
+            transport = httpx.ASGITransport(app=make_app(session_factory))
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                return await claim_race(client, session_factory, ADMINS)
+        finally:
+            await engine.dispose()
+
+    responses, winner = asyncio.run(run())
+
+    winners = [response for response in responses if response.status_code == 200]
+    assert len(winners) == 1
+    assert sum(response.status_code == 400 for response in responses) == ADMINS - 1
+    assert winner is not None
+    assert winners[0].json()["admin_id"] == winner
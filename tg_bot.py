@@ -1,92 +1,179 @@
 import asyncio
 from aiogram import Bot, Dispatcher, Router, types
+from aiogram.client.session.aiohttp import AiohttpSession
+from aiogram.client.telegram import TelegramAPIServer
 import os
 from dotenv import load_dotenv
 from aiogram.filters import Command
+from aiogram.fsm.context import FSMContext
+from aiogram.fsm.state import State, StatesGroup
+from aiogram.fsm.storage.base import BaseStorage
+from aiogram.fsm.storage.memory import MemoryStorage
 from dotenv import load_dotenv
 from sqlalchemy import select
 
 from models import RepairRequest, User, Users_in_Telegram
-from settings import async_session
+from settings import api_config, async_engine, async_session
 from models import RepairRequest,Users_in_Telegram
 from schemas import request
-import httpx
+from tools.notifications import OutboxDispatcher
+from tools.repairs import list_messages, list_repairs, owned_by_telegram
 
 load_dotenv()
 
 
 token = os.getenv("TOKEN_BOT")
 
-bot = Bot(token=token)  # type: ignore
-router = Router()
-dp = Dispatcher()
+session = None
+if api_config.TELEGRAM_API_URL:
+    session = AiohttpSession(api=TelegramAPIServer.from_base(api_config.TELEGRAM_API_URL))
 
 
+def make_storage(config=api_config) -> BaseStorage:
+    """Стан розмов: "memory" або "redis" (переживає перезапуск бота)"""
+    if config.BOT_FSM_STORAGE == "redis":
+        from aiogram.fsm.storage.redis import RedisStorage
 
-async def send_msg(user_site_id, message):
-    async with async_session() as session:
-        user_tg_info = await session.execute(
-            select(Users_in_Telegram).filter_by(user_in_site=user_site_id)
-        )
-        user_tg_info = user_tg_info.scalars().one_or_none()
-        if user_tg_info and user_tg_info.user_tg_id:
-            await bot.send_message(chat_id=user_tg_info.user_tg_id, text=message)
+        return RedisStorage.from_url(config.REDIS_URL)
+    return MemoryStorage()
+
+
+class Conversation(StatesGroup):
+    """На що чекає бот від конкретного чату після команди"""
+
+    waiting_code = State()
+    waiting_repair_id = State()
+
+
+bot = Bot(token=token, session=session)  # type: ignore
+router = Router()
+dp = Dispatcher(storage=make_storage())
+
+
+async def send_msg(chat_id, message):
+    """Надіслати повідомлення в прив'язаний чат"""
+    await bot.send_message(chat_id=chat_id, text=message)
 
 
 @dp.message(Command("start"))
-async def start_command(message: types.Message):
+async def start_command(message: types.Message, state: FSMContext):
+    await state.set_state(Conversation.waiting_code)
     await message.answer(
         "Вітаю! Це бот служби підтримки. Будь ласка, введіть ваш унікальний код для авторизації."
     )
 
-    @dp.message()
-    async def get_code(message: types.Message):
-        user_code = message.text.strip() if message.text else ""
-        user_tg_id = message.chat.id
 
-        async with async_session() as session:
-            stmt = select(Users_in_Telegram).where(
-                Users_in_Telegram.tg_code == user_code
-            )
-            user_check = await session.execute(stmt)
-            user_check = user_check.scalar_one_or_none()
-
-            if user_check:
-                user_check.user_tg_id = str(user_tg_id)
-                session.add(user_check)
-                await session.commit()
-                await message.answer(
-                    "Ви успішно додані до бота! Будемо інформувати вас про статус ваших заявок."
-                )
-            else:
-                await message.answer(
-                    "Невірний код. Будь ласка, перевірте та спробуйте ще раз."
-                )
+# Telegram обмежує повідомлення 4096 символами
+MAX_LIST_ITEMS = 20
+MAX_TEXT_LENGTH = 4000
+
+
+def format_repairs(repairs: list[dict]) -> str:
+    """repairs - до MAX_LIST_ITEMS + 1 новіших: зайвий лише показує, що є ще"""
+    if not repairs:
+        return "У вас поки немає заявок на ремонт."
+    lines = [
+        f"#{repair['id']} [{repair['status'].value}] {repair['description'][:100]}"
+        for repair in repairs[:MAX_LIST_ITEMS]
+    ]
+    if len(repairs) > MAX_LIST_ITEMS:
+        lines.append(f"Показано {MAX_LIST_ITEMS} останніх, усі заявки - в особистому кабінеті.")
+    return ("Ваші заявки на ремонт:\n" + "\n".join(lines))[:MAX_TEXT_LENGTH]
+
+
+def format_messages(repair_id: int, messages: list[dict]) -> str:
+    if not messages:
+        return f"У заявці #{repair_id} поки немає повідомлень."
+    lines = [
+        f"{item['created_at']:%d.%m %H:%M} "
+        f"{item['admin']['username'] if item['admin'] else 'Майстер'}: {item['message']}"
+        for item in messages[-MAX_LIST_ITEMS:]
+    ]
+    return (f"Повідомлення заявки #{repair_id}:\n" + "\n".join(lines))[-MAX_TEXT_LENGTH:]
 
 
 @dp.message(Command("myrequests"))
 async def repairrequests_command(message: types.Message):
-    async with httpx.AsyncClient() as client:
-        response = await client.get(f"http://127.0.0.1:8000/account/tg/repairs?tg_id={str(message.chat.id)}")
-    await message.answer(f"ваші запити на ремонт: {response.json()}")
+    async with async_session() as session:
+        repairs = await list_repairs(
+            session, owned_by_telegram(message.chat.id), limit=MAX_LIST_ITEMS + 1
+        )
+    await message.answer(format_repairs(repairs))
 
 
 @dp.message(Command("messages"))
-async def messages_command(message: types.Message):
+async def messages_command(message: types.Message, state: FSMContext):
+    await state.set_state(Conversation.waiting_repair_id)
     await message.answer(
         "Напишіть номер заявки з якої ви хочете побачити повідомлення."
     )
 
-    @dp.message()
-    async def get_messages(message: types.Message):
-        print(message.chat.id)
-        repair_id = message.text.strip() if message.text else ""
-        async with httpx.AsyncClient() as client:
-            response = await client.get(f"http://127.0.0.1:8000/account/messages?tg_id={str(message.chat.id)}&repair_id={repair_id}")
-        await message.answer(f"ваші запити на ремонт: {response.json()}")
 
+# Відповіді на стан розмови реєструються після команд, тож команда
+# посеред розмови обробляється як команда, а не як введений текст
+
+
+@dp.message(Conversation.waiting_code)
+async def get_code(message: types.Message, state: FSMContext):
+    user_code = message.text.strip() if message.text else ""
+    user_tg_id = message.chat.id
+
+    async with async_session() as session:
+        stmt = select(Users_in_Telegram).where(
+            Users_in_Telegram.tg_code == user_code
+        )
+        user_check = await session.execute(stmt)
+        user_check = user_check.scalar_one_or_none()
+
+        if user_check:
+            user_check.user_tg_id = str(user_tg_id)
+            session.add(user_check)
+            await session.commit()
+            await state.clear()
+            await message.answer(
+                "Ви успішно додані до бота! Будемо інформувати вас про статус ваших заявок."
+            )
+        else:
+            await message.answer(
+                "Невірний код. Будь ласка, перевірте та спробуйте ще раз."
+            )
+
+
+@dp.message(Conversation.waiting_repair_id)
+async def get_messages(message: types.Message, state: FSMContext):
+    repair_id = message.text.strip().lstrip("#") if message.text else ""
+    if not repair_id.isdigit():
+        await message.answer("Номер заявки має бути числом, наприклад 42.")
+        return
+    async with async_session() as session:
+        messages = await list_messages(
+            session, int(repair_id), owned_by_telegram(message.chat.id)
+        )
+    if messages is None:
+        await message.answer("Заявку не знайдено серед ваших.")
+        return
+    await state.clear()
+    await message.answer(format_messages(int(repair_id), messages))
 
 
 async def start():
     dp.include_router(router)
     await dp.start_polling(bot)
+
+
+async def main():
+    """Процес бота: long polling та розсилка outbox.
+
+    Єдиний споживач getUpdates; API лише пише сповіщення в outbox.
+    """
+    dispatcher = asyncio.create_task(OutboxDispatcher(send_msg).run())
+    try:
+        await start()
+    finally:
+        dispatcher.cancel()
+        await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
+
@@ -1,12 +1,20 @@
+import hashlib
+import logging
 import os
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone
 
 import jwt
-from sqlalchemy import select
-from werkzeug.security import check_password_hash
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from models.models import User
 from settings import api_config, async_session
+from tools.passwords import verify_password
+
+logger = logging.getLogger(__name__)
 
 
 def generate_secret_key():
@@ -25,9 +33,7 @@ def create_access_token(payload: dict, expires_delta: timedelta | None = None):
         expire = datetime.now(timezone.utc) + timedelta(hours=24)
     
     to_encode.update({"exp": expire})
-    
-    print(f"Creating token with payload: {to_encode}")
-    
+
     jwt_token = jwt.encode(
         to_encode, 
         api_config.SECRET_KEY, 
@@ -37,72 +43,165 @@ def create_access_token(payload: dict, expires_delta: timedelta | None = None):
     return jwt_token
 
 
+class TokenCache:
+    """LRU кеш перевірених payload, ключ — sha256 токена.
+
+    Запис живе не довше за exp самого токена.
+    """
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data: OrderedDict[bytes, dict] = OrderedDict()
+
+    def get(self, key: bytes) -> dict | None:
+        payload = self._data.get(key)
+        if payload is None:
+            self.misses += 1
+            return None
+        if payload["exp"] <= time.time():
+            del self._data[key]
+            self.misses += 1
+            return None
+        self._data.move_to_end(key)
+        self.hits += 1
+        return payload
+
+    def put(self, key: bytes, payload: dict):
+        self._data[key] = payload
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def clear(self):
+        self._data.clear()
+
+    def stats(self) -> dict:
+        return {"size": len(self._data), "hits": self.hits, "misses": self.misses}
+
+
+token_cache = TokenCache(api_config.TOKEN_CACHE_SIZE)
+
+
 def decode_access_token(token: str):
-    """Декодування JWT токена"""
-    print(f"\n{'='*50}")
-    print(f"DECODE TOKEN DEBUG")
-    print(f"Token received: {token[:30] if token else 'None'}...")
-    print(f"Token length: {len(token) if token else 0}")
-    print(f"SECRET_KEY: {api_config.SECRET_KEY[:10]}...")
-    print(f"ALGORITHM: {api_config.ALGORITHM}")
-    
+    """Декодування JWT токена (з кешем перевірених токенів)"""
     if not token:
-        print("❌ ERROR: Token is empty!")
-        print(f"{'='*50}\n")
         return None
-    
+
+    key = hashlib.sha256(token.encode()).digest()
+    payload = token_cache.get(key)
+    if payload is not None:
+        return dict(payload)
+
     try:
         payload = jwt.decode(
             token,
             api_config.SECRET_KEY,
             algorithms=[api_config.ALGORITHM],
-            options={"verify_exp": True}
+            options={"verify_exp": True, "require": ["exp"]},
         )
-        
-        print(f"✅ Token decoded successfully!")
-        print(f"   - sub: {payload.get('sub')}")
-        print(f"   - username: {payload.get('username')}")
-        print(f"   - is_admin: {payload.get('is_admin')}")
-        print(f"   - exp: {payload.get('exp')}")
-        print(f"{'='*50}\n")
-        
-        return payload
-        
-    except jwt.ExpiredSignatureError:
-        print("❌ ERROR: Token has expired!")
-        print(f"{'='*50}\n")
-        return None
-        
-    except jwt.InvalidTokenError as e:
-        print(f"❌ ERROR: Invalid token: {e}")
-        print(f"{'='*50}\n")
+    except jwt.PyJWTError as e:
+        logger.debug("Invalid token: %s", e)
         return None
-        
-    except Exception as e:
-        print(f"❌ ERROR: Unexpected error: {e}")
-        import traceback
-        traceback.print_exc()
-        print(f"{'='*50}\n")
+
+    token_cache.put(key, payload)
+    return dict(payload)
+
+
+@dataclass(frozen=True, slots=True)
+class Identity:
+    """Поточний користувач для навбару та перевірки is_admin, без зв'язків"""
+
+    id: int
+    username: str
+    email: str
+    is_admin: bool
+
+
+class IdentityCache:
+    """LRU кеш Identity за id користувача з коротким TTL.
+
+    Зміни User через ORM в цьому процесі скидають запис одразу,
+    зміни з інших процесів підхоплюються не пізніше ніж через ttl.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._data: OrderedDict[int, tuple[Identity, float]] = OrderedDict()
+
+    def get(self, user_id: int) -> Identity | None:
+        entry = self._data.get(user_id)
+        if entry is None or entry[1] <= time.monotonic():
+            self._data.pop(user_id, None)
+            self.misses += 1
+            return None
+        self._data.move_to_end(user_id)
+        self.hits += 1
+        return entry[0]
+
+    def set(self, identity: Identity):
+        self._data[identity.id] = (identity, time.monotonic() + self.ttl)
+        self._data.move_to_end(identity.id)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def invalidate(self, user_id: int):
+        self._data.pop(user_id, None)
+
+    def clear(self):
+        self._data.clear()
+
+    def stats(self) -> dict:
+        return {"size": len(self._data), "hits": self.hits, "misses": self.misses}
+
+
+identities = IdentityCache(api_config.IDENTITY_CACHE_SIZE, api_config.IDENTITY_CACHE_TTL)
+
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _invalidate_identity(mapper, connection, target: User):
+    identities.invalidate(target.id)
+
+
+# Лише дані для навбару та перевірки is_admin
+IDENTITY_COLUMNS = select(User.id, User.username, User.email, User.is_admin)
+
+
+async def load_identity(db: AsyncSession, user_id: int) -> Identity | None:
+    """Identity з кешу; при промаху — один SELECT чотирьох колонок"""
+    identity = identities.get(user_id)
+    if identity is not None:
+        return identity
+
+    row = (
+        await db.execute(IDENTITY_COLUMNS.where(User.id == user_id))
+    ).one_or_none()
+    if row is None:
         return None
 
+    identity = Identity(*row)
+    identities.set(identity)
+    return identity
+
 
 async def authenticate_user(username: str, password: str):
-    """Аутентифікація користувача"""
-    print(f"Authenticating user: {username}")
-    
+    """Аутентифікація користувача.
+
+    Хеш перевіряється вже після закриття сесії: повільний verify_password
+    не тримає з'єднання пулу.
+    """
     async with async_session() as session:
-        user_stmt = select(User).where(User.username == username)
-        result = await session.execute(user_stmt)
-        user = result.scalar_one_or_none()
-        
-        if not user:
-            print(f"User {username} not found")
-            return False
-        
-        if not check_password_hash(user.password, password):
-            print(f"Invalid password for user {username}")
-            return False
-        
-        print(f"User {username} authenticated successfully. is_admin={user.is_admin}")
-        return user
+        user = await session.scalar(select(User).where(User.username == username))
+
+    if not user:
+        return False
+
+    if not await verify_password(user.password, password):
+        return False
 
+    return user
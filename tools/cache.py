@@ -0,0 +1,320 @@
+"""Кеш відповідей списків заявок з підміною бекенда (пам'ять процесу або Redis).
+
+Ключ запису містить версії просторів імен ("all", "user:7", "admin:3").
+Інвалідація не шукає ключі, а записує просторам нові унікальні версії, тож
+старі записи стають недосяжними і просто вичерпують TTL. Ключ обчислюється
+до читання з БД, тому відповідь, прочитана до конкурентного запису,
+зберігається під старою версією і ніколи не віддається.
+"""
+
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, Iterable
+
+import orjson
+from fastapi import Request
+from starlette.responses import Response
+
+from settings import api_config
+from tools.sync import not_modified
+
+logger = logging.getLogger(__name__)
+
+# Заголовки версії списку, що зберігаються разом з тілом
+CACHED_HEADERS = ("etag", "x-sync-cursor")
+
+
+class MemoryBackend:
+    """LRU в пам'яті процесу з TTL на запис"""
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._data: OrderedDict[str, tuple[bytes, float | None]] = OrderedDict()
+
+    def _get(self, key: str) -> bytes | None:
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        value, expires_at = entry
+        if expires_at is not None and expires_at <= time.monotonic():
+            del self._data[key]
+            return None
+        self._data.move_to_end(key)
+        return value
+
+    async def get(self, key: str) -> bytes | None:
+        return self._get(key)
+
+    async def mget(self, keys: list[str]) -> list[bytes | None]:
+        return [self._get(key) for key in keys]
+
+    async def set(
+        self, key: str, value: bytes, ttl: float | None = None, nx: bool = False
+    ) -> bool:
+        if nx and self._get(key) is not None:
+            return False
+        expires_at = time.monotonic() + ttl if ttl else None
+        self._data[key] = (value, expires_at)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+        return True
+
+
+class RedisBackend:
+    """Обгортка над redis.asyncio.Redis (або InMemoryRedis для тестів)"""
+
+    def __init__(self, client):
+        self.client = client
+
+    async def get(self, key: str) -> bytes | None:
+        return await self.client.get(key)
+
+    async def mget(self, keys: list[str]) -> list[bytes | None]:
+        return await self.client.mget(keys)
+
+    async def set(
+        self, key: str, value: bytes, ttl: float | None = None, nx: bool = False
+    ) -> bool:
+        return bool(
+            await self.client.set(
+                key, value, px=int(ttl * 1000) if ttl else None, nx=nx
+            )
+        )
+
+
+class InMemoryPubSub:
+    """Підписка InMemoryRedis.pubsub(): subscribe, listen, aclose"""
+
+    def __init__(self, client: "InMemoryRedis"):
+        self.client = client
+        self.channels: set[str] = set()
+        self._messages: asyncio.Queue = asyncio.Queue()
+
+    async def subscribe(self, *channels: str):
+        for channel in channels:
+            self.client._channels.setdefault(channel, set()).add(self._messages)
+            self.channels.add(channel)
+            self._messages.put_nowait(
+                {"type": "subscribe", "channel": channel.encode(), "data": 1}
+            )
+
+    async def listen(self):
+        while True:
+            yield await self._messages.get()
+
+    async def aclose(self):
+        for channel in self.channels:
+            self.client._channels[channel].discard(self._messages)
+        self.channels.clear()
+
+
+class InMemoryRedis:
+    """Підмножина API redis.asyncio.Redis в пам'яті: get, mget, set, delete,
+    publish та pubsub.
+
+    Дає перевірити шлях RedisBackend без сервера Redis. Lua-скрипти
+    виконуються Python-реалізаціями з add_script_handler.
+    """
+
+    _script_handlers: dict = {}
+
+    @classmethod
+    def add_script_handler(cls, script: str, handler):
+        """handler(client, keys, args) виконує script через публічні команди client"""
+        cls._script_handlers[script] = handler
+
+    def __init__(self):
+        self._data: dict[str, tuple[bytes, float | None]] = {}
+        self.commands = 0
+        self._channels: dict[str, set[asyncio.Queue]] = {}
+
+    def _get(self, name: str) -> bytes | None:
+        entry = self._data.get(name)
+        if entry is None:
+            return None
+        value, expires_at = entry
+        if expires_at is not None and expires_at <= time.monotonic():
+            del self._data[name]
+            return None
+        return value
+
+    async def get(self, name: str) -> bytes | None:
+        self.commands += 1
+        return self._get(name)
+
+    async def mget(self, keys: list[str]) -> list[bytes | None]:
+        self.commands += 1
+        return [self._get(key) for key in keys]
+
+    async def set(self, name, value, ex=None, px=None, nx=False) -> bool | None:
+        self.commands += 1
+        if nx and self._get(name) is not None:
+            return None
+        if isinstance(value, str):
+            value = value.encode()
+        ttl = ex if ex is not None else (px / 1000 if px is not None else None)
+        self._data[name] = (value, time.monotonic() + ttl if ttl else None)
+        return True
+
+    async def delete(self, *names) -> int:
+        self.commands += 1
+        return sum(self._data.pop(name, None) is not None for name in names)
+
+    async def publish(self, channel: str, message) -> int:
+        self.commands += 1
+        if isinstance(message, str):
+            message = message.encode()
+        subscribers = self._channels.get(channel, ())
+        for queue in subscribers:
+            queue.put_nowait(
+                {"type": "message", "channel": channel.encode(), "data": message}
+            )
+        return len(subscribers)
+
+    def pubsub(self) -> InMemoryPubSub:
+        return InMemoryPubSub(self)
+
+    def register_script(self, script: str):
+        handler = self._script_handlers[script]
+
+        async def run(keys=(), args=()):
+            # Скрипт - одна команда Redis, хоч би скільки команд викликав handler
+            commands = self.commands
+            try:
+                return await handler(self, keys, args)
+            finally:
+                self.commands = commands + 1
+
+        return run
+
+    async def flushall(self):
+        self._data.clear()
+
+    async def aclose(self):
+        pass
+
+
+def make_backend(config=api_config):
+    """Бекенд з налаштувань: "memory", "redis" або "none" (кеш вимкнено)"""
+    if config.CACHE_BACKEND == "redis":
+        import redis.asyncio as redis
+
+        return RedisBackend(redis.from_url(config.REDIS_URL))
+    if config.CACHE_BACKEND == "memory":
+        return MemoryBackend(config.CACHE_SIZE)
+    return None
+
+
+class ResponseCache:
+    """Кеш JSON-відповідей у версіонованих просторах імен з лічильниками"""
+
+    def __init__(self, backend, ttl: float, prefix: str = "rh:"):
+        self.backend = backend
+        self.ttl = ttl
+        self.prefix = prefix
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+
+    def _version_key(self, namespace: str) -> str:
+        return f"{self.prefix}v:{namespace}"
+
+    async def _key(self, namespaces: tuple[str, ...], variant: str) -> str:
+        version_keys = [self._version_key(ns) for ns in namespaces]
+        versions = await self.backend.mget(version_keys)
+        parts = []
+        for namespace, version_key, version in zip(namespaces, version_keys, versions):
+            if version is None:
+                # Версію витіснено або ще не було: нова унікальна, а не 0,
+                # щоб не воскресити записи під старою версією
+                version = str(time.time_ns()).encode()
+                await self.backend.set(version_key, version, self.ttl * 10, nx=True)
+            parts.append(f"{namespace}@{version.decode()}")
+        return f"{self.prefix}{'|'.join(parts)}|{variant}"
+
+    async def respond(
+        self,
+        request: Request,
+        namespaces: tuple[str, ...],
+        build: Callable[[], Awaitable[Response]],
+    ) -> Response:
+        """Відповідь з кешу або build(); кешуються лише відповіді 200"""
+        if self.backend is None:
+            return await build()
+
+        variant = str(sorted(request.query_params.multi_items()))
+        try:
+            key = await self._key(namespaces, variant)
+            cached = await self.backend.get(key)
+        except Exception as e:
+            self.errors += 1
+            logger.warning("Cache read failed: %s", e)
+            return await build()
+
+        if cached is not None:
+            self.hits += 1
+            raw_headers, body = cached.split(b"\n", 1)
+            headers = orjson.loads(raw_headers)
+            etag = headers.get("etag")
+            if etag and (response := not_modified(request, etag)):
+                return response
+            return Response(body, media_type="application/json", headers=headers)
+
+        self.misses += 1
+        response = await build()
+        if response.status_code == 200:
+            headers = {
+                name: response.headers[name]
+                for name in CACHED_HEADERS
+                if name in response.headers
+            }
+            try:
+                await self.backend.set(
+                    key, orjson.dumps(headers) + b"\n" + response.body, self.ttl
+                )
+            except Exception as e:
+                self.errors += 1
+                logger.warning("Cache write failed: %s", e)
+        return response
+
+    async def invalidate(self, *namespaces: str):
+        if self.backend is None:
+            return
+        for namespace in namespaces:
+            try:
+                await self.backend.set(
+                    self._version_key(namespace),
+                    str(time.time_ns()).encode(),
+                    self.ttl * 10,
+                )
+            except Exception as e:
+                self.errors += 1
+                logger.warning("Cache invalidation failed: %s", e)
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "backend": type(self.backend).__name__ if self.backend else None,
+            "hits": self.hits,
+            "misses": self.misses,
+            "errors": self.errors,
+            "hit_ratio": round(self.hits / total, 3) if total else None,
+        }
+
+
+repair_lists = ResponseCache(make_backend(), api_config.CACHE_TTL)
+
+
+async def invalidate_repair_lists(
+    user_ids: Iterable[int] = (), admin_ids: Iterable[int] = ()
+):
+    """Після запису заявок: загальні списки адміна, списки авторів та майстрів"""
+    namespaces = ["all"]
+    namespaces += [f"user:{user_id}" for user_id in set(user_ids)]
+    namespaces += [
+        f"admin:{admin_id}" for admin_id in set(admin_ids) if admin_id is not None
+    ]
+    await repair_lists.invalidate(*namespaces)
@@ -0,0 +1,164 @@
+import asyncio
+import contextlib
+import json
+import logging
+
+from fastapi.encoders import jsonable_encoder
+
+from settings import api_config
+
+logger = logging.getLogger(__name__)
+
+REPAIR_EVENT_FIELDS = (
+    "id",
+    "description",
+    "photo_url",
+    "status",
+    "required_time",
+    "created_at",
+    "updated_at",
+    "user_id",
+    "admin_id",
+)
+
+
+class EventBus:
+    """Розсилка подій підписникам SSE у межах процесу.
+
+    Кожен підписник має обмежену чергу; якщо клієнт не встигає, його
+    черга очищається і він отримує подію resync.
+    """
+
+    def __init__(self, queue_size: int = 100):
+        self.queue_size = queue_size
+        self._subscribers: set[asyncio.Queue] = set()
+        self._seq = 0
+
+    def publish(self, event: str, data: dict):
+        self._deliver(event, data)
+
+    def _deliver(self, event: str, data: dict):
+        self._seq += 1
+        message = (self._seq, event, data)
+        for queue in list(self._subscribers):
+            try:
+                queue.put_nowait(message)
+            except asyncio.QueueFull:
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait((self._seq, "resync", {}))
+
+    @contextlib.contextmanager
+    def subscribe(self):
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        self._subscribers.add(queue)
+        try:
+            yield queue
+        finally:
+            self._subscribers.discard(queue)
+
+    async def start(self):
+        pass
+
+    async def stop(self):
+        pass
+
+
+class RedisEventBus(EventBus):
+    """Події всіх воркерів через Redis pub/sub.
+
+    publish лише ставить подію в чергу, яку по порядку відправляє в канал
+    одна фонова задача; інша задача слухає канал і роздає події (включно з
+    власними) підписникам SSE цього воркера. Після розриву з'єднання
+    підписники отримують resync: події за цей час могли загубитись.
+    """
+
+    def __init__(
+        self,
+        client,
+        channel: str = "repair_events",
+        queue_size: int = 100,
+        outgoing_size: int = 10_000,
+    ):
+        super().__init__(queue_size)
+        self.client = client
+        self.channel = channel
+        self._outgoing: asyncio.Queue = asyncio.Queue(maxsize=outgoing_size)
+        self._tasks: list[asyncio.Task] = []
+
+    def publish(self, event: str, data: dict):
+        try:
+            self._outgoing.put_nowait(json.dumps([event, data], ensure_ascii=False))
+        except asyncio.QueueFull:
+            logger.warning("Event queue is full, dropping %s event", event)
+
+    async def start(self):
+        self._tasks = [
+            asyncio.create_task(self._publisher()),
+            asyncio.create_task(self._listener()),
+        ]
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        await self.client.aclose()
+
+    async def _publisher(self):
+        while True:
+            message = await self._outgoing.get()
+            try:
+                await self.client.publish(self.channel, message)
+            except Exception:
+                logger.exception("Failed to publish event")
+                self._deliver("resync", {})
+
+    async def _listener(self):
+        while True:
+            pubsub = self.client.pubsub()
+            try:
+                await pubsub.subscribe(self.channel)
+                async for message in pubsub.listen():
+                    if message["type"] == "message":
+                        event, data = json.loads(message["data"])
+                        self._deliver(event, data)
+            except Exception:
+                logger.exception("Event subscription lost, reconnecting")
+            finally:
+                await pubsub.aclose()
+            self._deliver("resync", {})
+            await asyncio.sleep(1)
+
+
+def make_event_bus(config=api_config):
+    """Бекенд з налаштувань: "memory" (лише свій воркер) або "redis" (усі воркери)"""
+    if config.EVENTS_BACKEND == "redis":
+        import redis.asyncio as redis
+
+        return RedisEventBus(redis.from_url(config.REDIS_URL))
+    return EventBus()
+
+
+repair_events = make_event_bus()
+
+
+def publish_repair(kind: str, repair, **extra):
+    """Подія зміни заявки: kind — create, update, assign або delete.
+
+    repair — ORM-об'єкт або вже готовий рядок списку (dict).
+    """
+    if isinstance(repair, dict):
+        data = dict(repair)
+    else:
+        data = {field: getattr(repair, field) for field in REPAIR_EVENT_FIELDS}
+    data.update(extra)
+    repair_events.publish("repair", {"type": kind, "repair": jsonable_encoder(data)})
+
+
+def format_sse(seq: int, event: str, data: dict) -> str:
+    return f"id: {seq}\nevent: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+def publish_repair_deleted(repair_id: int):
+    repair_events.publish("repair", {"type": "delete", "repair": {"id": repair_id}})
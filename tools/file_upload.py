@@ -1,23 +1,84 @@
+import hashlib
 import os
 import uuid
 
 import aiofiles
-from fastapi import UploadFile
+from fastapi import HTTPException, Request, UploadFile, status
 
 from settings import api_config
 
+# Запас на інші поля форми та заголовки частин multipart
+FORM_OVERHEAD = 64 * 1024
 
-async def generate_file_url(
-    filename: str, dest_dir: str = api_config.STATIC_IMAGES_DIR
+
+def file_extension(filename: str | None) -> str:
+    """Розширення файлу у безпечному для імені вигляді (.jpg, .mov)"""
+    ext = os.path.splitext(filename or "")[1].lower()
+    if not ext[1:].isalnum() or len(ext) > 10:
+        return ""
+    return ext
+
+
+def too_large(max_size: int) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_413_CONTENT_TOO_LARGE,
+        detail=f"Файл більший за {max_size // (1024 * 1024)} МБ",
+    )
+
+
+class ContentLengthLimit:
+    """Перевірка для RateLimitMiddleware: 413 за Content-Length, до читання тіла.
+
+    Запити без Content-Length (chunked) обмежує лише save_file.
+    """
+
+    def __init__(self, max_size: int = api_config.MAX_UPLOAD_SIZE):
+        self.max_size = max_size
+
+    async def __call__(self, request: Request):
+        try:
+            length = int(request.headers.get("content-length", 0))
+        except ValueError:
+            return
+        if length > self.max_size + FORM_OVERHEAD:
+            raise too_large(self.max_size)
+
+
+async def save_file(
+    file: UploadFile,
+    dest_dir: str = api_config.STATIC_IMAGES_DIR,
+    max_size: int = api_config.MAX_UPLOAD_SIZE,
+    chunk_size: int = api_config.UPLOAD_CHUNK_SIZE,
 ) -> str:
-    # Dummy implementation, replace with actual file storage logic
-    unique_filename = f"{uuid.uuid4().hex}_{filename}"
+    """Потоковий запис файлу під ім'ям sha256 вмісту.
+
+    Файл читається частинами по chunk_size, тож пам'ять не залежить від
+    розміру завантаження. Однакові файли зберігаються один раз.
+    Повертає шлях до збереженого файлу.
+    """
     os.makedirs(dest_dir, exist_ok=True)
-    file_path = os.path.join(dest_dir, unique_filename)
-    return file_path
+    tmp_path = os.path.join(dest_dir, f".upload-{uuid.uuid4().hex}.part")
+    digest = hashlib.sha256()
+    size = 0
 
+    try:
+        async with aiofiles.open(tmp_path, "wb") as buffer:
+            while chunk := await file.read(chunk_size):
+                size += len(chunk)
+                if size > max_size:
+                    raise too_large(max_size)
+                digest.update(chunk)
+                await buffer.write(chunk)
 
-async def save_file(file: UploadFile, file_path: str):
-    async with aiofiles.open(file_path, "wb") as buffer:
-        content = await file.read()
-        await buffer.write(content)
+        file_path = os.path.join(
+            dest_dir, digest.hexdigest() + file_extension(file.filename)
+        )
+        if os.path.exists(file_path):
+            os.remove(tmp_path)
+        else:
+            os.replace(tmp_path, file_path)
+        return file_path
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
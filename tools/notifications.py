@@ -0,0 +1,186 @@
+import asyncio
+import datetime as dt
+import logging
+import time
+from typing import Awaitable, Callable
+
+from sqlalchemy import insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from models import NotificationOutbox, Users_in_Telegram, utcnow
+from settings import api_config, async_session
+
+logger = logging.getLogger(__name__)
+
+# send(chat_id, text): надіслати в прив'язаний чат Telegram
+SendFunc = Callable[[str, str], Awaitable[None]]
+
+
+def queue_notification(db: AsyncSession, user_id: int, message: str):
+    """Додати сповіщення в outbox; відправиться після commit цієї ж сесії"""
+    db.add(NotificationOutbox(user_id=user_id, message=message))
+
+
+async def queue_notifications(db: AsyncSession, user_ids, message: str):
+    """Одне сповіщення кожному користувачу одним INSERT"""
+    rows = [{"user_id": user_id, "message": message} for user_id in set(user_ids)]
+    if rows:
+        await db.execute(insert(NotificationOutbox), rows)
+
+
+class OutboxDispatcher:
+    """Фоновий розбір outbox пачками з лімітами Telegram та повторами"""
+
+    def __init__(
+        self,
+        send: SendFunc,
+        session_factory=async_session,
+        batch_size: int = api_config.OUTBOX_BATCH_SIZE,
+        poll_interval: float = api_config.OUTBOX_POLL_INTERVAL,
+        max_attempts: int = api_config.OUTBOX_MAX_ATTEMPTS,
+        lease: float = api_config.OUTBOX_LEASE,
+        global_rate: float = api_config.TELEGRAM_GLOBAL_RATE,
+        chat_interval: float = api_config.TELEGRAM_CHAT_INTERVAL,
+    ):
+        self.send = send
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.max_attempts = max_attempts
+        self.lease = lease
+        self.global_interval = 1 / global_rate
+        self.chat_interval = chat_interval
+
+        self._global_next = 0.0
+        self._chat_next: dict[int, float] = {}
+
+    def backoff(self, attempts: int) -> float:
+        return min(2**attempts, 600)
+
+    async def _wait_global_slot(self):
+        now = time.monotonic()
+        if self._global_next > now:
+            await asyncio.sleep(self._global_next - now)
+            now = self._global_next
+        self._global_next = now + self.global_interval
+
+    def _chat_ready(self, user_id: int) -> bool:
+        now = time.monotonic()
+        if self._chat_next.get(user_id, 0) > now:
+            return False
+        self._chat_next[user_id] = now + self.chat_interval
+        if len(self._chat_next) > 10_000:
+            self._chat_next = {k: v for k, v in self._chat_next.items() if v > now}
+        return True
+
+    async def _claim(self) -> tuple[list[tuple[int, int, str, str]], int]:
+        """Взяти пачку в оренду: (id, attempts, chat_id, текст) для відправки.
+
+        Другим значенням - скільки записів завершено одразу (Telegram не
+        прив'язано).
+
+        Рядкам зсувається next_attempt_at на lease, і транзакція одразу
+        комітиться: інші диспетчери їх пропускають, а якщо процес впаде до
+        запису результату, після оренди їх буде надіслано повторно.
+        """
+        claimed = []
+        finished = 0
+        async with self.session_factory() as session:
+            # chat id читається разом із записом: відв'язка на сайті (інший
+            # процес) діє з наступної пачки, без кешу в процесі бота.
+            # user_in_site не унікальний, тож береться один, найновіший
+            # прив'язаний рядок: JOIN дав би по запису на кожну прив'язку
+            chat_id = (
+                select(Users_in_Telegram.user_tg_id)
+                .where(
+                    Users_in_Telegram.user_in_site == NotificationOutbox.user_id,
+                    Users_in_Telegram.user_tg_id.is_not(None),
+                )
+                .order_by(Users_in_Telegram.id.desc())
+                .limit(1)
+                .scalar_subquery()
+            )
+            stmt = (
+                select(NotificationOutbox, chat_id)
+                .where(
+                    NotificationOutbox.sent_at.is_(None),
+                    NotificationOutbox.attempts < self.max_attempts,
+                    NotificationOutbox.next_attempt_at <= utcnow(),
+                )
+                .order_by(NotificationOutbox.id)
+                .limit(self.batch_size)
+                .with_for_update(skip_locked=True, of=NotificationOutbox)
+            )
+            batch = (await session.execute(stmt)).all()
+
+            lease_until = utcnow() + dt.timedelta(seconds=self.lease)
+            for item, chat_id in batch:
+                if not chat_id:
+                    item.attempts += 1
+                    item.sent_at = utcnow()
+                    item.last_error = "telegram not linked"
+                    finished += 1
+                    continue
+                if not self._chat_ready(item.user_id):
+                    continue
+                item.next_attempt_at = lease_until
+                claimed.append((item.id, item.attempts, chat_id, item.message))
+
+            await session.commit()
+        return claimed, finished
+
+    async def _record(self, results: list[dict]):
+        """Результати відправки одним коротким UPDATE за первинним ключем"""
+        if not results:
+            return
+        async with self.session_factory() as session:
+            await session.execute(update(NotificationOutbox), results)
+            await session.commit()
+
+    async def drain_once(self) -> int:
+        """Обробити одну пачку; повертає кількість оброблених записів.
+
+        Відправка йде поза транзакцією: блокування рядків та з'єднання пулу
+        не тримаються, поки Telegram відповідає чи діє ліміт частоти.
+        """
+        claimed, finished = await self._claim()
+
+        results = []
+        for item_id, attempts, chat_id, message in claimed:
+            await self._wait_global_slot()
+            try:
+                await self.send(chat_id, message)
+            except Exception as e:
+                retry_after = getattr(e, "retry_after", None)
+                delay = retry_after or self.backoff(attempts + 1)
+                results.append(
+                    {
+                        "id": item_id,
+                        "attempts": attempts + 1,
+                        "last_error": str(e)[:1000],
+                        "next_attempt_at": utcnow() + dt.timedelta(seconds=delay),
+                    }
+                )
+                logger.warning("Notification %s failed: %s", item_id, e)
+            else:
+                results.append(
+                    {
+                        "id": item_id,
+                        "attempts": attempts + 1,
+                        "sent_at": utcnow(),
+                        "last_error": None,
+                    }
+                )
+
+        await self._record(results)
+        return finished + len(results)
+
+    async def run(self):
+        while True:
+            try:
+                processed = await self.drain_once()
+            except Exception:
+                logger.exception("Outbox dispatcher error")
+                processed = 0
+            if processed < self.batch_size:
+                await asyncio.sleep(self.poll_interval)
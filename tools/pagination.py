@@ -0,0 +1,35 @@
+import base64
+import datetime as dt
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+
+def encode_cursor(created_at: dt.datetime, row_id: int) -> str:
+    """Курсор для keyset-пагінації по (created_at, id)"""
+    raw = f"{created_at.isoformat()}|{row_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[dt.datetime, int]:
+    """Розбір курсора; ValueError якщо курсор пошкоджений"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        raw = base64.urlsafe_b64decode(padded.encode()).decode()
+        created_at, row_id = raw.rsplit("|", 1)
+        return dt.datetime.fromisoformat(created_at), int(row_id)
+    except Exception as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+
+def build_page(rows: list, limit: int, serialize=None) -> dict:
+    """Формує сторінку з rows, вибраних з limit + 1"""
+    has_more = len(rows) > limit
+    items = rows[:limit]
+    next_cursor = None
+    if has_more and items:
+        last = items[-1]
+        next_cursor = encode_cursor(last.created_at, last.id)
+    if serialize is not None:
+        items = [serialize(row) for row in items]
+    return {"items": items, "next_cursor": next_cursor}
@@ -0,0 +1,57 @@
+import asyncio
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+
+from fastapi import HTTPException, status
+from werkzeug.security import check_password_hash, generate_password_hash
+
+from settings import api_config
+
+_executor: Executor | None = None
+_slots = asyncio.Semaphore(api_config.HASH_MAX_WORKERS)
+
+
+def get_executor() -> Executor:
+    """Окремий пул для хешування, щоб не займати default executor"""
+    global _executor
+    if _executor is None:
+        if api_config.HASH_EXECUTOR == "process":
+            _executor = ProcessPoolExecutor(max_workers=api_config.HASH_MAX_WORKERS)
+        else:
+            _executor = ThreadPoolExecutor(
+                max_workers=api_config.HASH_MAX_WORKERS, thread_name_prefix="hash"
+            )
+    return _executor
+
+
+def shutdown_executor():
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=True)
+        _executor = None
+
+
+async def _run(func, *args):
+    """Виконати func у пулі; 503, якщо вільного слота немає довше за таймаут"""
+    try:
+        await asyncio.wait_for(_slots.acquire(), api_config.HASH_QUEUE_TIMEOUT)
+    except asyncio.TimeoutError:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Сервер перевантажено, спробуйте пізніше",
+            headers={"Retry-After": str(max(1, round(api_config.HASH_QUEUE_TIMEOUT)))},
+        )
+    try:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(get_executor(), func, *args)
+    finally:
+        _slots.release()
+
+
+async def hash_password(password: str) -> str:
+    """Асинхронний generate_password_hash"""
+    return await _run(generate_password_hash, password)
+
+
+async def verify_password(password_hash: str, password: str) -> bool:
+    """Асинхронний check_password_hash"""
+    return await _run(check_password_hash, password_hash, password)
@@ -0,0 +1,216 @@
+"""Обмеження частоти запитів token bucket (у формі GCRA) по IP та користувачу.
+
+Стан відра - один час TAT ("коли відро знову повне"): запит дозволено, якщо
+після нього TAT випереджає now не більше ніж на burst інтервалів. Так
+бекенду потрібне одне значення на ключ, а в Redis перевірка та запис
+виконуються атомарно одним Lua-скриптом.
+"""
+
+import inspect
+import math
+import time
+from collections import OrderedDict
+from typing import Callable
+
+from fastapi import HTTPException, Request, status
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from settings import api_config
+from tools.auth import decode_access_token
+from tools.cache import InMemoryRedis
+
+
+def parse_limit(spec: str) -> tuple[int, float]:
+    """"10/60" -> 10 запитів на 60 секунд: (burst, інтервал поповнення)"""
+    count, seconds = spec.split("/")
+    return int(count), float(seconds) / int(count)
+
+
+def take(
+    tat: float | None, now: float, interval: float, burst: int
+) -> tuple[bool, float, float]:
+    """Спробувати взяти токен: (дозволено, новий TAT, через скільки повторити)"""
+    tat = max(tat or now, now)
+    new_tat = tat + interval
+    allow_at = new_tat - burst * interval
+    if allow_at > now:
+        return False, tat, allow_at - now
+    return True, new_tat, 0.0
+
+
+class MemoryBuckets:
+    """Відра в пам'яті процесу; найдавніші ключі витісняються (відро скидається)"""
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._data: OrderedDict[str, float] = OrderedDict()
+
+    async def take(self, key: str, interval: float, burst: int) -> tuple[bool, float]:
+        allowed, tat, retry_after = take(
+            self._data.get(key), time.monotonic(), interval, burst
+        )
+        if allowed:
+            self._data[key] = tat
+            self._data.move_to_end(key)
+            if len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+        return allowed, retry_after
+
+
+# Те саме, що take(), але атомарно в Redis і за годинником сервера Redis,
+# тож воркери з різним часом ділять одне відро
+TAKE_LUA = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local interval = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local tat = tonumber(redis.call('GET', KEYS[1]) or now)
+if tat < now then tat = now end
+local new_tat = tat + interval
+local allow_at = new_tat - burst * interval
+if allow_at > now then
+  return {0, tostring(allow_at - now)}
+end
+redis.call('SET', KEYS[1], tostring(new_tat), 'PX', math.ceil((new_tat - now) * 1000))
+return {1, '0'}
+"""
+
+
+async def _take_in_memory_redis(client: InMemoryRedis, keys, args):
+    """Виконання TAKE_LUA для InMemoryRedis"""
+    (key,) = keys
+    interval, burst = float(args[0]), int(args[1])
+    tat = await client.get(key)
+    now = time.time()
+    allowed, tat, retry_after = take(
+        float(tat) if tat is not None else None, now, interval, burst
+    )
+    if not allowed:
+        return [0, str(retry_after).encode()]
+    await client.set(key, str(tat), px=math.ceil((tat - now) * 1000))
+    return [1, b"0"]
+
+
+InMemoryRedis.add_script_handler(TAKE_LUA, _take_in_memory_redis)
+
+
+class RedisBuckets:
+    """Відра в Redis, спільні для всіх воркерів"""
+
+    def __init__(self, client, prefix: str = "rl:"):
+        self.prefix = prefix
+        self._take = client.register_script(TAKE_LUA)
+
+    async def take(self, key: str, interval: float, burst: int) -> tuple[bool, float]:
+        allowed, retry_after = await self._take(
+            keys=[self.prefix + key], args=[interval, burst]
+        )
+        return bool(allowed), float(retry_after)
+
+
+def make_buckets(config=api_config):
+    """Бекенд з налаштувань: "memory", "redis" або "none" (без обмежень)"""
+    if config.RATE_LIMIT_BACKEND == "redis":
+        import redis.asyncio as redis
+
+        return RedisBuckets(redis.from_url(config.REDIS_URL))
+    if config.RATE_LIMIT_BACKEND == "memory":
+        return MemoryBuckets(config.RATE_LIMIT_MAX_KEYS)
+    return None
+
+
+buckets = make_buckets()
+
+
+def client_ip(request: Request) -> str | None:
+    # За проксі IP клієнта підставляє uvicorn --proxy-headers
+    return request.client.host if request.client else None
+
+
+def cookie_user(request: Request) -> str | None:
+    user = decode_access_token(request.cookies.get("access_token"))
+    return user["sub"] if user else None
+
+
+async def ip_username(request: Request) -> str | None:
+    # Форму вже розібрав FastAPI, Starlette повертає її з кешу запиту.
+    # Відро на пару (IP, ім'я): чужий IP не може заблокувати вхід власнику.
+    # Перебір імен з одного IP стримує окреме, ширше відро login_ip_limit
+    username = (await request.form()).get("username")
+    if not isinstance(username, str):
+        return None
+    return f"{client_ip(request)}:{username.lower()}"
+
+
+class RateLimit:
+    """Залежність FastAPI: окреме відро на кожен ключ (IP, користувач, ...).
+
+    Перевищення будь-якого з ключів дає 429 з Retry-After.
+    """
+
+    def __init__(self, name: str, spec: str, *keys: Callable):
+        self.name = name
+        self.burst, self.interval = parse_limit(spec)
+        self.keys = keys or (client_ip,)
+
+    async def __call__(self, request: Request):
+        if buckets is None:
+            return
+        for key_func in self.keys:
+            value = key_func(request)
+            if inspect.isawaitable(value):
+                value = await value
+            if value is None:
+                continue
+            allowed, retry_after = await buckets.take(
+                f"{self.name}:{key_func.__name__}:{value}", self.interval, self.burst
+            )
+            if not allowed:
+                raise HTTPException(
+                    status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                    detail="Too many requests",
+                    headers={"Retry-After": str(math.ceil(retry_after))},
+                )
+
+
+class RateLimitMiddleware:
+    """Ліміти для шляхів, перевірені до читання тіла запиту.
+
+    Залежність FastAPI виконується вже після розбору multipart-форми, тож
+    для завантажень ліміт має стояти тут: запит понад ліміт отримує 429,
+    не передавши файл. Крім RateLimit, шлях може мати інші перевірки з тим
+    самим інтерфейсом (ContentLengthLimit). Перевірки не повинні читати тіло.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        limits: dict[tuple[str, str], tuple[Callable, ...]],
+        handler,
+    ):
+        self.app = app
+        self.limits = limits
+        self.handler = handler
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        checks = ()
+        if scope["type"] == "http":
+            checks = self.limits.get((scope["method"], scope["path"]), ())
+        if checks:
+            request = Request(scope, receive)
+            try:
+                for check in checks:
+                    await check(request)
+            except HTTPException as exc:
+                response = await self.handler(request, exc)
+                await response(scope, receive, send)
+                return
+        await self.app(scope, receive, send)
+
+
+login_limit = RateLimit("login", api_config.RATE_LIMIT_LOGIN, ip_username)
+login_ip_limit = RateLimit("login_ip", api_config.RATE_LIMIT_LOGIN_IP, client_ip)
+register_limit = RateLimit("register", api_config.RATE_LIMIT_REGISTER, client_ip)
+repair_add_limit = RateLimit(
+    "repair_add", api_config.RATE_LIMIT_REPAIR_ADD, client_ip, cookie_user
+)
@@ -0,0 +1,86 @@
+"""Читання заявок для HTTP-роутів та Telegram-бота, без HTTP між ними.
+
+Власника задає умова: owned_by_user(user_id) для сайту або
+owned_by_telegram(chat_id) для бота.
+"""
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from models import AdminMessage, RepairRequest, User, Users_in_Telegram
+from models.loading import REPAIR_LIST_COLUMNS, repair_row_dict
+
+
+def owned_by_user(user_id: int):
+    return RepairRequest.user_id == user_id
+
+
+def owned_by_telegram(chat_id: int | str):
+    # Один чат може бути прив'язаний до кількох акаунтів сайту
+    return RepairRequest.user_id.in_(
+        select(Users_in_Telegram.user_in_site).where(
+            Users_in_Telegram.user_tg_id == str(chat_id)
+        )
+    )
+
+
+def repairs_query(*conditions, limit: int | None = None):
+    """Заявки (колонки REPAIR_LIST_COLUMNS), новіші першими"""
+    return (
+        REPAIR_LIST_COLUMNS.where(*conditions)
+        .order_by(RepairRequest.created_at.desc(), RepairRequest.id.desc())
+        .limit(limit)
+    )
+
+
+async def list_repairs(
+    db: AsyncSession, *conditions, limit: int | None = None
+) -> list[dict]:
+    """Заявки (рядки RepairRequestOut_schemas), новіші першими; limit=None - усі"""
+    stmt = repairs_query(*conditions, limit=limit)
+    return [repair_row_dict(row) for row in (await db.execute(stmt)).all()]
+
+
+def messages_query(repair_id: int, *conditions):
+    """Заявка LEFT JOIN її повідомлення з іменами майстрів, від старих до нових"""
+    return (
+        select(
+            AdminMessage.id,
+            AdminMessage.message,
+            AdminMessage.created_at,
+            AdminMessage.admin_id,
+            User.username.label("admin_username"),
+        )
+        .select_from(RepairRequest)
+        .outerjoin(AdminMessage, AdminMessage.request_id == RepairRequest.id)
+        .outerjoin(User, AdminMessage.admin_id == User.id)
+        .where(RepairRequest.id == repair_id, *conditions)
+        .order_by(AdminMessage.created_at, AdminMessage.id)
+    )
+
+
+async def list_messages(
+    db: AsyncSession, repair_id: int, *conditions
+) -> list[dict] | None:
+    """Повідомлення майстрів по заявці, від старих до нових.
+
+    Один запит: заявка LEFT JOIN повідомлення. None - заявки немає
+    або вона не проходить conditions (чужа).
+    """
+    rows = (await db.execute(messages_query(repair_id, *conditions))).all()
+    if not rows:
+        return None
+    return [
+        {
+            "id": row.id,
+            "message": row.message,
+            "created_at": row.created_at,
+            "admin": (
+                {"id": row.admin_id, "username": row.admin_username}
+                if row.admin_id is not None
+                else None
+            ),
+        }
+        for row in rows
+        if row.id is not None
+    ]
@@ -0,0 +1,89 @@
+import datetime as dt
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from models import (ReportAdminWorkload, ReportCompletionTime, ReportDailyIntake,
+                    ReportStatusCount, RequestStatus, User, utcnow)
+
+DEFAULT_REPORT_DAYS = 30
+
+# Кількість усіх заявок одним рядком на статус, без підрахунку заявок
+TOTAL_REPAIRS = select(
+    func.coalesce(func.sum(ReportStatusCount.count), 0)
+).scalar_subquery()
+
+
+def completion_stats(buckets) -> dict:
+    """Середній час та p90 (верхня межа години) з гістограми (hour, count, total_seconds)"""
+    total = sum(bucket.count for bucket in buckets)
+    if not total:
+        return {"completed": 0, "mean_hours": None, "p90_hours": None}
+
+    mean_seconds = sum(bucket.total_seconds for bucket in buckets) / total
+    threshold = 0.9 * total
+    seen = 0
+    for bucket in buckets:
+        seen += bucket.count
+        if seen >= threshold:
+            p90_hours = bucket.hour + 1
+            break
+    return {
+        "completed": total,
+        "mean_hours": round(mean_seconds / 3600, 1),
+        "p90_hours": p90_hours,
+    }
+
+
+async def load_status_counts(db: AsyncSession) -> dict:
+    """Кількість заявок за статусами: один рядок на статус, без підрахунку заявок"""
+    status_rows = (await db.execute(select(ReportStatusCount))).scalars()
+    counts = {status.value: 0 for status in RequestStatus}
+    for row in status_rows:
+        counts[row.status.value] = row.count
+    return counts
+
+
+async def load_report(db: AsyncSession, days: int = DEFAULT_REPORT_DAYS) -> dict:
+    """Звіт із зведених таблиць; розмір відповіді не залежить від кількості заявок"""
+    counts = await load_status_counts(db)
+
+    buckets = (
+        await db.execute(
+            select(ReportCompletionTime)
+            .where(ReportCompletionTime.count > 0)
+            .order_by(ReportCompletionTime.hour)
+        )
+    ).scalars().all()
+
+    workload = (
+        await db.execute(
+            select(User.id, User.username, ReportAdminWorkload.open_count)
+            .join(User, User.id == ReportAdminWorkload.admin_id)
+            .where(ReportAdminWorkload.open_count > 0)
+            .order_by(ReportAdminWorkload.open_count.desc(), User.id)
+        )
+    ).all()
+
+    # Дні рахуються від created_at, тобто в UTC
+    since = utcnow().date() - dt.timedelta(days=days - 1)
+    intake = (
+        await db.execute(
+            select(ReportDailyIntake.day, ReportDailyIntake.count)
+            .where(ReportDailyIntake.day >= since)
+            .order_by(ReportDailyIntake.day)
+        )
+    ).all()
+
+    return {
+        "status_counts": counts,
+        "total": sum(counts.values()),
+        "completion": completion_stats(buckets),
+        "admin_workload": [
+            {"admin_id": row.id, "username": row.username, "open": row.open_count}
+            for row in workload
+        ],
+        "daily_intake": [
+            {"day": row.day.isoformat(), "count": row.count} for row in intake
+        ],
+    }
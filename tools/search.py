@@ -0,0 +1,81 @@
+import re
+
+from sqlalchemy import func, literal_column, select, union_all
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from models import AdminMessage, RepairRequest
+from models.loading import REPAIR_LIST_COLUMNS, repair_row_dict
+from models.search import (TS_CONFIG, admin_messages_fts, admin_messages_ts,
+                           repair_requests_fts, repair_requests_ts)
+
+
+def fts5_query(q: str) -> str | None:
+    """Текст користувача у синтаксис FTS5: кожне слово в лапках, між ними AND"""
+    words = re.findall(r"\w+", q)
+    if not words:
+        return None
+    return " ".join(f'"{word}"' for word in words)
+
+
+def ranked_matches(dialect: str, q: str):
+    """Підзапит (repair_id, rank): найкращий збіг по опису або повідомленнях"""
+    if dialect == "postgresql":
+        query = func.websearch_to_tsquery(literal_column(f"'{TS_CONFIG}'"), q)
+        repairs, messages = repair_requests_ts, admin_messages_ts
+        matches = union_all(
+            select(
+                repairs.c.id.label("repair_id"),
+                func.ts_rank(repairs.c.search_vector, query).label("rank"),
+            ).where(repairs.c.search_vector.op("@@")(query)),
+            select(
+                messages.c.request_id,
+                func.ts_rank(messages.c.search_vector, query),
+            ).where(messages.c.search_vector.op("@@")(query)),
+        ).subquery("matches")
+    else:
+        query = fts5_query(q)
+        repairs = literal_column(repair_requests_fts.name)
+        messages = literal_column(admin_messages_fts.name)
+        # bm25 від'ємний: чим менше, тим краще, тому міняємо знак
+        matches = union_all(
+            select(
+                repair_requests_fts.c.rowid.label("repair_id"),
+                (-func.bm25(repairs)).label("rank"),
+            ).where(repairs.op("MATCH")(query)),
+            select(AdminMessage.request_id, -func.bm25(messages))
+            .select_from(admin_messages_fts)
+            .join(AdminMessage, AdminMessage.id == admin_messages_fts.c.rowid)
+            .where(messages.op("MATCH")(query)),
+        ).subquery("matches")
+
+    return (
+        select(matches.c.repair_id, func.max(matches.c.rank).label("rank"))
+        .group_by(matches.c.repair_id)
+        .subquery("ranked")
+    )
+
+
+async def search_repairs(
+    db: AsyncSession, q: str, conditions: list, limit: int, offset: int
+) -> dict:
+    """Сторінка заявок за релевантністю; {items, next_offset}"""
+    dialect = db.get_bind().dialect.name
+    if dialect != "postgresql" and fts5_query(q) is None:
+        return {"items": [], "next_offset": None}
+
+    ranked = ranked_matches(dialect, q)
+    stmt = (
+        REPAIR_LIST_COLUMNS.add_columns(ranked.c.rank)
+        .join(ranked, ranked.c.repair_id == RepairRequest.id)
+        .where(*conditions)
+        .order_by(ranked.c.rank.desc(), RepairRequest.id.desc())
+        .limit(limit + 1)
+        .offset(offset)
+    )
+    rows = (await db.execute(stmt)).all()
+
+    has_more = len(rows) > limit
+    return {
+        "items": [repair_row_dict(row) for row in rows[:limit]],
+        "next_offset": offset + limit if has_more else None,
+    }
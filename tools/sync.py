@@ -0,0 +1,98 @@
+"""Інкрементальна синхронізація списків та умовні GET (ETag / 304).
+
+Курсор since кодує (updated_at, id) останнього відданого рядка, тому
+наступний запит повертає лише змінені після нього рядки. Видалення так
+не видно — їх приносить потік /admin/events або зміна ETag.
+
+updated_at задає застосунок до commit, тож рядок транзакції, що
+закомітилась пізніше, ніж клієнт пересунув курсор за її updated_at, since
+не поверне; такі зміни приносить потік подій або повне перезавантаження.
+"""
+
+import hashlib
+
+from fastapi import HTTPException, Request, Response, status
+from sqlalchemy import func, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from tools.pagination import decode_cursor, encode_cursor
+
+
+def version_query(model, conditions: list, count=None):
+    """(кількість, updated_at, id найновішого рядка) одним запитом"""
+    if count is None:
+        count = select(func.count()).select_from(model).where(*conditions).scalar_subquery()
+    newest = (
+        select(model.updated_at, model.id)
+        .where(*conditions)
+        .order_by(model.updated_at.desc(), model.id.desc())
+        .limit(1)
+    )
+    return select(
+        count,
+        newest.with_only_columns(model.updated_at).scalar_subquery(),
+        newest.with_only_columns(model.id).scalar_subquery(),
+    )
+
+
+async def list_version(
+    db: AsyncSession, model, conditions: list, request: Request, count=None
+) -> tuple[str, str | None]:
+    """Сильний ETag з кількості рядків та найновішого (updated_at, id).
+
+    count - готовий SQL-вираз кількості рядків (напр. зі зведеної таблиці)
+    замість count(*) по всіх відфільтрованих рядках. Другим значенням
+    повертається стартовий курсор since для клієнта, який щойно завантажив
+    повний список: він вказує на найновіший рядок, тож перший since
+    не повертає його повторно.
+    """
+    count, max_updated, max_id = (
+        await db.execute(version_query(model, conditions, count))
+    ).one()
+    query = "&".join(sorted(request.url.query.split("&")))
+    raw = f"{count}|{max_updated.isoformat() if max_updated else ''}|{max_id}|{query}"
+    etag = '"' + hashlib.sha256(raw.encode()).hexdigest()[:32] + '"'
+    sync_cursor = encode_cursor(max_updated, max_id) if max_updated else None
+    return etag, sync_cursor
+
+
+def version_headers(etag: str, sync_cursor: str | None) -> dict:
+    headers = {"ETag": etag}
+    if sync_cursor:
+        headers["X-Sync-Cursor"] = sync_cursor
+    return headers
+
+
+def not_modified(request: Request, etag: str) -> Response | None:
+    """304, якщо клієнт вже має цю версію списку"""
+    header = request.headers.get("if-none-match")
+    if header and (header.strip() == "*" or etag in (t.strip() for t in header.split(","))):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+    return None
+
+
+def parse_cursor(cursor: str):
+    try:
+        return decode_cursor(cursor)
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+
+
+async def changed_since(
+    db: AsyncSession, stmt, model, since: str, limit: int, serialize=None
+) -> dict:
+    """Рядки (колонки stmt), змінені після курсора since, та новий курсор"""
+    since_updated_at, since_id = parse_cursor(since)
+    stmt = (
+        stmt.where(tuple_(model.updated_at, model.id) > tuple_(since_updated_at, since_id))
+        .order_by(model.updated_at, model.id)
+        .limit(limit + 1)
+    )
+    rows = (await db.execute(stmt)).all()
+    has_more = len(rows) > limit
+    items = rows[:limit]
+    if items:
+        since = encode_cursor(items[-1].updated_at, items[-1].id)
+    if serialize is not None:
+        items = [serialize(row) for row in items]
+    return {"items": items, "cursor": since, "has_more": has_more}
@@ -0,0 +1,81 @@
+import os
+from collections import OrderedDict
+from typing import Callable
+
+import jinja2
+from fastapi import Request
+from fastapi.templating import Jinja2Templates
+from starlette.responses import Response
+
+from settings import api_config
+
+
+def make_environment(
+    directory: str = api_config.TEMPLATES_DIR,
+    cache_dir: str | None = api_config.TEMPLATE_CACHE_DIR,
+    auto_reload: bool = api_config.TEMPLATE_AUTO_RELOAD,
+) -> jinja2.Environment:
+    """Jinja-оточення з кешем байткоду на диску (спільний для всіх воркерів)"""
+    bytecode_cache = None
+    if cache_dir:
+        os.makedirs(cache_dir, exist_ok=True)
+        bytecode_cache = jinja2.FileSystemBytecodeCache(cache_dir)
+    return jinja2.Environment(
+        loader=jinja2.FileSystemLoader(directory),
+        autoescape=True,
+        bytecode_cache=bytecode_cache,
+        auto_reload=auto_reload,
+    )
+
+
+# Єдиний екземпляр для всіх роутів та обробників помилок
+templates = Jinja2Templates(env=make_environment())
+
+
+def precompile_templates(env: jinja2.Environment = templates.env) -> int:
+    """Скомпілювати всі шаблони заздалегідь, щоб перший запит не платив за це"""
+    names = env.list_templates(extensions=["html"])
+    for name in names:
+        env.get_template(name)
+    return len(names)
+
+
+class PageCache:
+    """LRU готових HTML-відповідей, ключ — шлях, query та стан авторизації.
+
+    Лише для сторінок, вміст яких залежить тільки від URL та того,
+    чи увійшов користувач (наприклад /help або / для анонімів).
+    """
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data: OrderedDict[tuple, tuple[bytes, int, str | None]] = OrderedDict()
+
+    def render(
+        self, request: Request, render: Callable[[], Response], auth: str = "anonymous"
+    ) -> Response:
+        key = (auth, request.url.path, request.url.query)
+        cached = self._data.get(key)
+        if cached is not None:
+            self._data.move_to_end(key)
+            self.hits += 1
+            body, status_code, media_type = cached
+            return Response(body, status_code=status_code, media_type=media_type)
+
+        self.misses += 1
+        response = render()
+        self._data[key] = (response.body, response.status_code, response.media_type)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+        return response
+
+    def clear(self):
+        self._data.clear()
+
+    def stats(self) -> dict:
+        return {"size": len(self._data), "hits": self.hits, "misses": self.misses}
+
+
+page_cache = PageCache(api_config.PAGE_CACHE_SIZE)
@@ -0,0 +1,58 @@
+from sqlalchemy import exists, func, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from models import RepairRequest, RequestStatus, User, Users_in_Telegram
+
+OPEN_STATUSES = (RequestStatus.NEW, RequestStatus.IN_PROGRESS, RequestStatus.MESSAGE)
+
+# Рядок списку користувачів; лічильники - корельовані підзапити по індексах
+# repair_requests(user_id, ...) та users_in_telegram(user_in_site), тож
+# рахуються лише для рядків сторінки, а не для всієї таблиці
+USER_LIST_COLUMNS = select(
+    User.id,
+    User.username,
+    User.email,
+    User.is_admin,
+    select(func.count())
+    .where(RepairRequest.user_id == User.id)
+    .scalar_subquery()
+    .label("total_repairs"),
+    select(func.count())
+    .where(RepairRequest.user_id == User.id, RepairRequest.status.in_(OPEN_STATUSES))
+    .scalar_subquery()
+    .label("open_repairs"),
+    exists()
+    .where(
+        Users_in_Telegram.user_in_site == User.id,
+        Users_in_Telegram.user_tg_id.is_not(None),
+    )
+    .label("telegram_linked"),
+)
+
+
+def user_search_condition(q: str):
+    """Початок username або email без урахування регістру (індекси ix_users_lower_*)"""
+    # Шаблон одним параметром, щоб планувальник бачив префікс і брав індекс
+    escaped = q.strip().lower().replace("/", "//").replace("%", "/%").replace("_", "/_")
+    pattern = escaped + "%"
+    return or_(
+        func.lower(User.username).like(pattern, escape="/"),
+        func.lower(User.email).like(pattern, escape="/"),
+    )
+
+
+async def list_users(
+    db: AsyncSession, q: str | None, cursor: int | None, limit: int
+) -> dict:
+    """Сторінка користувачів за id з лічильниками; {items, next_cursor}"""
+    stmt = USER_LIST_COLUMNS
+    if q:
+        stmt = stmt.where(user_search_condition(q))
+    if cursor is not None:
+        stmt = stmt.where(User.id > cursor)
+    stmt = stmt.order_by(User.id).limit(limit + 1)
+
+    rows = (await db.execute(stmt)).all()
+    items = [row._asdict() for row in rows[:limit]]
+    has_more = len(rows) > limit
+    return {"items": items, "next_cursor": items[-1]["id"] if has_more else None}